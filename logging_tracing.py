@@ -1,22 +1,32 @@
 import asyncio
+import atexit
+import json
 import logging
+import sys
+import threading
+from collections import deque
 
-from azure.monitor.opentelemetry.exporter import (
-    AzureMonitorLogExporter,
-    AzureMonitorMetricExporter,
-    AzureMonitorTraceExporter,
-)
+try:
+    from azure.monitor.opentelemetry.exporter import (
+        AzureMonitorLogExporter,
+        AzureMonitorMetricExporter,
+        AzureMonitorTraceExporter,
+    )
+except ImportError:
+    # Local telemetry backends work without the Azure Monitor exporter installed
+    AzureMonitorLogExporter = AzureMonitorMetricExporter = AzureMonitorTraceExporter = None
 
 from opentelemetry._logs import set_logger_provider
 from opentelemetry.metrics import set_meter_provider
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
-from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+from opentelemetry.sdk._logs.export import BatchLogRecordProcessor, ConsoleLogExporter
 from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
 from opentelemetry.sdk.metrics.view import DropAggregation, View
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from opentelemetry.semconv.resource import ResourceAttributes
 from opentelemetry.trace import set_tracer_provider
 from dotenv import load_dotenv
@@ -29,12 +39,148 @@ connection_string = os.environ.get("APPLICATON_INSIGHTS_CONNECTION_STRING")
 
 enable_gen_ai = os.environ.get("SEMANTICKERNEL_EXPERIMENTAL_GENAI_ENABLE_OTEL_DIAGNOSTICS_SENSITIVE")
 
+# Telemetry backend: "azure" (Azure Monitor), "ring_buffer" (in-process), "file" (local OTLP-JSON lines) or "none"
+telemetry_backend = os.environ.get("TELEMETRY_BACKEND", "azure").lower()
+# Fraction of traces to sample (parent-based, so child spans follow their root)
+sampling_ratio = float(os.environ.get("TELEMETRY_SAMPLING_RATIO", "1.0"))
+span_file_path = os.environ.get("TELEMETRY_FILE_PATH", "telemetry_spans.jsonl")
+# The file backend also writes logs and metrics as JSON lines next to the spans
+log_file_path = os.environ.get("TELEMETRY_LOG_FILE_PATH", "telemetry_logs.jsonl")
+metric_file_path = os.environ.get("TELEMETRY_METRIC_FILE_PATH", "telemetry_metrics.jsonl")
+ring_buffer_size = int(os.environ.get("TELEMETRY_RING_BUFFER_SIZE", "10000"))
+metric_export_interval_millis = int(os.environ.get("TELEMETRY_METRIC_EXPORT_INTERVAL_MS", "5000"))
+
 # Create a resource to represent the service/sample
 resource = Resource.create({ResourceAttributes.SERVICE_NAME: "telemetry-application-insights-quickstart"})
 
 
-def set_up_logging():
-    exporter = AzureMonitorLogExporter(connection_string=connection_string)
+class RingBufferSpanExporter(SpanExporter):
+    """Keeps the most recent finished spans in memory for offline analysis."""
+
+    def __init__(self, max_spans=10000):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        with self._lock:
+            self._spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def get_finished_spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self):
+        pass
+
+
+def _otlp_attribute_value(value):
+    """Encode an attribute value the way OTLP/JSON does."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_attribute_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _span_to_otlp(span):
+    """Convert a finished SDK span into an OTLP/JSON span object."""
+    parent = span.parent
+    return {
+        "traceId": format(span.context.trace_id, "032x"),
+        "spanId": format(span.context.span_id, "016x"),
+        "parentSpanId": format(parent.span_id, "016x") if parent else "",
+        "name": span.name,
+        "kind": span.kind.value + 1,
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": [{"key": k, "value": _otlp_attribute_value(v)} for k, v in (span.attributes or {}).items()],
+        "status": {"code": span.status.status_code.value},
+    }
+
+
+class OTLPJsonFileSpanExporter(SpanExporter):
+    """
+    Appends each exported batch to a local file as one OTLP/JSON ExportTraceServiceRequest
+    per line, so spans can be analyzed offline without a collector.
+    """
+
+    def __init__(self, file_path):
+        self._file = open(file_path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        by_scope = {}
+        for span in spans:
+            scope = span.instrumentation_scope
+            key = (scope.name, scope.version) if scope else ("", None)
+            by_scope.setdefault(key, []).append(_span_to_otlp(span))
+
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": k, "value": _otlp_attribute_value(v)} for k, v in resource.attributes.items()]},
+                "scopeSpans": [
+                    {"scope": {"name": name, "version": version or ""}, "spans": otlp_spans}
+                    for (name, version), otlp_spans in by_scope.items()
+                ],
+            }]
+        }
+        with self._lock:
+            self._file.write(json.dumps(request) + "\n")
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+# In-process span buffer, set when the ring_buffer backend is active
+span_buffer = None
+
+
+def _resolve_backend():
+    """Fall back to the local OTLP-JSON file when Azure Monitor is selected but not usable."""
+    if telemetry_backend == "azure" and (not connection_string or AzureMonitorTraceExporter is None):
+        logging.getLogger(__name__).warning(
+            "Azure Monitor exporter or APPLICATON_INSIGHTS_CONNECTION_STRING unavailable; "
+            f"writing telemetry to {span_file_path} instead."
+        )
+        return "file"
+    return telemetry_backend
+
+
+def _exporter_transport():
+    """The pipeline's shared pooled HTTP transport, or {} when src/utils is not importable."""
+    try:
+        from utils.http_transport import get_azure_core_transport
+    except ImportError:
+        return {}
+    return {"transport": get_azure_core_transport()}
+
+
+def _json_lines_file(path):
+    """Append-mode file for the console exporters, closed on interpreter exit."""
+    f = open(path, "a", encoding="utf-8")
+    atexit.register(f.close)
+    return f
+
+
+def set_up_logging(backend="azure"):
+    if backend == "azure":
+        exporter = AzureMonitorLogExporter(connection_string=connection_string, **_exporter_transport())
+    else:
+        exporter = ConsoleLogExporter(
+            out=_json_lines_file(log_file_path), formatter=lambda record: record.to_json(indent=None) + "\n"
+        )
 
     # Create and set a global logger provider for the application.
     logger_provider = LoggerProvider(resource=resource)
@@ -55,24 +201,41 @@ def set_up_logging():
     logger.setLevel(logging.INFO)
 
 
-def set_up_tracing():
-    exporter = AzureMonitorTraceExporter(connection_string=connection_string)
+def set_up_tracing(backend="azure"):
+    global span_buffer
 
     # Initialize a trace provider for the application. This is a factory for creating tracers.
-    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider = TracerProvider(
+        resource=resource,
+        sampler=ParentBased(TraceIdRatioBased(sampling_ratio)),
+    )
     # Span processors are initialized with an exporter which is responsible
     # for sending the telemetry data to a particular backend.
-    tracer_provider.add_span_processor(BatchSpanProcessor(exporter))
+    if backend == "azure":
+        tracer_provider.add_span_processor(BatchSpanProcessor(AzureMonitorTraceExporter(connection_string=connection_string, **_exporter_transport())))
+    elif backend == "file":
+        tracer_provider.add_span_processor(BatchSpanProcessor(OTLPJsonFileSpanExporter(span_file_path)))
+    elif backend == "ring_buffer":
+        span_buffer = RingBufferSpanExporter(ring_buffer_size)
+        # Nothing else reads the buffer, so summarize it before the process exits
+        atexit.register(_log_span_buffer_summary)
+        # Appending to the buffer is cheap, so spans are exported synchronously on end
+        tracer_provider.add_span_processor(SimpleSpanProcessor(span_buffer))
     # Sets the global default tracer provider
     set_tracer_provider(tracer_provider)
 
 
-def set_up_metrics():
-    exporter = AzureMonitorMetricExporter(connection_string=connection_string)
+def set_up_metrics(backend="azure"):
+    if backend == "azure":
+        exporter = AzureMonitorMetricExporter(connection_string=connection_string, **_exporter_transport())
+    else:
+        exporter = ConsoleMetricExporter(
+            out=_json_lines_file(metric_file_path), formatter=lambda data: data.to_json(indent=None) + "\n"
+        )
 
     # Initialize a metric provider for the application. This is a factory for creating meters.
     meter_provider = MeterProvider(
-        metric_readers=[PeriodicExportingMetricReader(exporter, export_interval_millis=5000)],
+        metric_readers=[PeriodicExportingMetricReader(exporter, export_interval_millis=metric_export_interval_millis)],
         resource=resource,
         views=[
             # Dropping all instrument names except for those starting with "semantic_kernel"
@@ -87,7 +250,120 @@ def set_up_metrics():
 
 # This must be done before any other telemetry calls
 def setup_telemetry():
-    set_up_logging()
-    set_up_tracing()
-    set_up_metrics()
+    backend = _resolve_backend()
+    if backend == "none":
+        return
+
+    # The in-process buffer keeps spans only; pipeline logs still reach pipeline.log
+    if backend in ("azure", "file"):
+        set_up_logging(backend)
+        set_up_metrics(backend)
+    set_up_tracing(backend)
+
+
+def _span_record(name, attributes, duration_ms):
+    return {"name": name, "attributes": attributes, "duration_ms": duration_ms}
+
+
+def load_spans_from_buffer(exporter=None):
+    """Normalize spans held by the ring buffer exporter into name/attributes/duration records."""
+    exporter = exporter or span_buffer
+    if exporter is None:
+        return []
+    return [
+        _span_record(span.name, dict(span.attributes or {}), (span.end_time - span.start_time) / 1e6)
+        for span in exporter.get_finished_spans()
+        if span.end_time is not None
+    ]
+
+
+def load_spans_from_file(file_path):
+    """Normalize spans written by OTLPJsonFileSpanExporter into name/attributes/duration records."""
+    records = []
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line).get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for span in scope_spans.get("spans", []):
+                        attributes = {
+                            a["key"]: next(iter(a["value"].values()), None) for a in span.get("attributes", [])
+                        }
+                        duration_ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                        records.append(_span_record(span["name"], attributes, duration_ms))
+    return records
+
+
+def classify_span(record):
+    """
+    Map a Semantic Kernel span to a (stage, plugin) pair. Model calls are keyed by their
+    gen_ai operation, kernel function spans by the plugin prefix of the fully qualified name.
+    """
+    name = record["name"]
+    operation = record["attributes"].get("gen_ai.operation.name")
+    if operation:
+        return operation, "-"
+    if name.startswith("execute_tool "):
+        return "execute_tool", name.split(" ", 1)[1].split("-", 1)[0]
+    if "-" in name and " " not in name:
+        return "function", name.split("-", 1)[0]
+    return name, "-"
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_spans(records):
+    """
+    Build a per-stage, per-plugin latency breakdown:
+    {stage: {plugin: {count, total_ms, mean_ms, p50_ms, p95_ms, max_ms}}}.
+    """
+    durations = {}
+    for record in records:
+        stage, plugin = classify_span(record)
+        durations.setdefault(stage, {}).setdefault(plugin, []).append(record["duration_ms"])
+
+    summary = {}
+    for stage, by_plugin in durations.items():
+        for plugin, values in by_plugin.items():
+            values.sort()
+            total = sum(values)
+            summary.setdefault(stage, {})[plugin] = {
+                "count": len(values),
+                "total_ms": round(total, 3),
+                "mean_ms": round(total / len(values), 3),
+                "p50_ms": round(_percentile(values, 50), 3),
+                "p95_ms": round(_percentile(values, 95), 3),
+                "max_ms": round(values[-1], 3),
+            }
+    return summary
+
+
+def format_span_summary(summary):
+    """Render a span summary as a plain-text table, slowest stages first."""
+    lines = [f"{'stage':<28} {'plugin':<26} {'count':>7} {'total_ms':>12} {'mean_ms':>10} {'p50_ms':>10} {'p95_ms':>10} {'max_ms':>10}"]
+    rows = [(stage, plugin, stats) for stage, by_plugin in summary.items() for plugin, stats in by_plugin.items()]
+    rows.sort(key=lambda r: r[2]["total_ms"], reverse=True)
+    for stage, plugin, st in rows:
+        lines.append(
+            f"{stage[:28]:<28} {plugin[:26]:<26} {st['count']:>7} {st['total_ms']:>12.1f} "
+            f"{st['mean_ms']:>10.1f} {st['p50_ms']:>10.1f} {st['p95_ms']:>10.1f} {st['max_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+
+def _log_span_buffer_summary():
+    """Log the latency breakdown of the spans held by the ring buffer (registered at exit)."""
+    records = load_spans_from_buffer()
+    if records:
+        logging.getLogger(__name__).info("Span latency summary:\n" + format_span_summary(summarize_spans(records)))
+
 
+if __name__ == "__main__":
+    # Usage: python logging_tracing.py [spans.jsonl]
+    path = sys.argv[1] if len(sys.argv) > 1 else span_file_path
+    print(format_span_summary(summarize_spans(load_spans_from_file(path))))
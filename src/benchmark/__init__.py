@@ -0,0 +1 @@
+# Initialize the benchmark package
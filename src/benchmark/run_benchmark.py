@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+# Same import layout main.py sets up for the pipeline modules
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (SRC_DIR, os.path.join(SRC_DIR, 'evaluator')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from utils.logger import logger, setup_logging
+from utils.profiling import profile_stage
+
+STAGES = ["mock_generation", "transform", "local_scoring", "report"]
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _paths(work_dir):
+    return {
+        "ground_truth": os.path.join(work_dir, "ground_truth.json"),
+        "predicted": os.path.join(work_dir, "agent_predicted.json"),
+        "transformed_json": os.path.join(work_dir, "agent_predicted_transformed.json"),
+        "transformed": os.path.join(work_dir, "agent_predicted_transformed.jsonl"),
+        "evaluation": os.path.join(work_dir, "evaluation_results.json"),
+        "report": os.path.join(work_dir, "evaluation_report.html"),
+    }
+
+
+def run_stage(stage, num_rows, work_dir, profiling_config=None):
+    """
+    Run one stage in the current (fresh) process and return ({timed_stage: wall_seconds},
+    peak_rss_mb). Pipeline modules are imported inside each branch so
+    a stage's peak RSS only reflects what that stage loads.
+    """
+    # A spawned process starts without logging; it writes to its own per-process log file
+    setup_logging()
+    paths = _paths(work_dir)
+    timings = {}
+
+    with profile_stage(stage, profiling_config, profile_name=f"{stage}_{num_rows}"):
+        if stage == "mock_generation":
+            from benchmark.synthetic_data import generate_datasets
+
+            start = time.perf_counter()
+            generate_datasets(num_rows, paths["ground_truth"], paths["predicted"])
+            timings[stage] = time.perf_counter() - start
+
+        elif stage == "transform":
+            from datatransformer.data_transform import load_agent_output, replace_predicted_with_mapped, write_transformed_outputs
+            from utils.load_mapping_schema import load_mapping_schema
+
+            # The same read, map and write steps as data_transform.main, both output files included
+            start = time.perf_counter()
+            mapped = replace_predicted_with_mapped(load_agent_output(paths["predicted"]), load_mapping_schema())
+            write_transformed_outputs(mapped, paths["transformed_json"], paths["transformed"])
+            timings[stage] = time.perf_counter() - start
+
+        elif stage == "local_scoring":
+            from local_eval import local_eval
+
+            start = time.perf_counter()
+            local_eval(paths["transformed"], paths["evaluation"])
+            timings[stage] = time.perf_counter() - start
+
+        elif stage == "report":
+            from reportgenerator.generate_report import build_report_context, load_data, render_report
+
+            template_path = os.path.join(SRC_DIR, "reportgenerator", "template", "report_template.html")
+            start = time.perf_counter()
+            rows, metrics = load_data(paths["evaluation"])
+            context = build_report_context(rows, metrics)
+            timings["report_aggregation"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            render_report(context, template_path, paths["report"])
+            timings["report_rendering"] = time.perf_counter() - start
+
+        else:
+            raise ValueError(f"Unknown benchmark stage: {stage}")
+
+    return timings, peak_rss_mb()
+
+
+def benchmark_size(num_rows, stages, work_dir, profiling_config=None):
+    """Run the selected stages in order for one dataset size, each in its own process."""
+    results = []
+    for stage in stages:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            timings, rss = executor.submit(run_stage, stage, num_rows, work_dir, profiling_config).result()
+
+        for timed_stage, wall_s in timings.items():
+            result = {
+                "rows": num_rows,
+                "stage": timed_stage,
+                "wall_s": round(wall_s, 4),
+                "peak_rss_mb": rss,
+                "rows_per_s": round(num_rows / wall_s, 1) if wall_s else None,
+            }
+            logger.info(f"Benchmark {timed_stage} @ {num_rows} rows: {result}")
+            results.append(result)
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of regressions where wall time or peak RSS exceeds baseline by more than `tolerance`."""
+    baseline_index = {(r["rows"], r["stage"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = baseline_index.get((result["rows"], result["stage"]))
+        if not base:
+            continue
+        for metric in ("wall_s", "peak_rss_mb"):
+            current, previous = result.get(metric), base.get(metric)
+            if current is not None and previous and current > previous * (1 + tolerance):
+                regressions.append(
+                    f"{result['stage']} @ {result['rows']} rows: {metric} {current} vs baseline {previous} "
+                    f"(+{(current / previous - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the evaluation pipeline stages on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Dataset sizes in rows.")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES, help="Stages to run, in order.")
+    parser.add_argument("--output", default=os.path.join(SRC_DIR, "results", "benchmark_results.json"),
+                        help="Where to write the benchmark results JSON.")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against; exits 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown vs baseline.")
+    parser.add_argument("--work-dir", help="Directory for generated datasets (default: temporary directory).")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="Profile each stage.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    profiling_config = None
+    if args.profile:
+        profiling_config = {
+            "enabled": True,
+            "profiler": args.profile,
+            "output_path": os.path.join(os.path.dirname(os.path.abspath(args.output)), "profiles"),
+        }
+    work_root = args.work_dir or tempfile.mkdtemp(prefix="agentic_eval_bench_")
+
+    results = []
+    try:
+        for num_rows in args.sizes:
+            work_dir = os.path.join(work_root, str(num_rows))
+            os.makedirs(work_dir, exist_ok=True)
+            results.extend(benchmark_size(num_rows, args.stages, work_dir, profiling_config))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    output = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    logger.info(f"Benchmark results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            logger.error(f"Performance regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        logger.info("No performance regressions against baseline.")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -0,0 +1,109 @@
+import json
+import random
+
+# Mirrors the plugins in datagenerator/plugins/control_plugins.py:
+# (plugin_name, function_name, {argument: candidate values}, result template, query template)
+CATALOG = [
+    ("tv_control", "control_device_operation", {"operation": ["on", "off"]}, "TV turned {operation}.", "turn {operation} the tv"),
+    ("tv_control", "adjust_volume", {"operation": ["increase", "decrease"]}, "TV volume {operation}d.", "{operation} the tv volume"),
+    ("tv_control", "switch_input_source", {"input_source": ["HDMI 1", "HDMI 2", "AV"]}, "TV input switched to {input_source}.", "switch the tv to {input_source}"),
+    ("tv_control", "open_application", {"app_name": ["Netflix", "YouTube", "Prime Video"]}, "{app_name} opened on the TV.", "open {app_name} on the tv"),
+    ("tv_control", "set_channel", {"channel": ["5", "7", "42", "101"]}, "TV channel set to {channel}.", "put the tv on channel {channel}"),
+    ("ac_control", "control_device_operation", {"operation": ["on", "off"]}, "Air conditioner turned {operation}.", "turn {operation} the air conditioner"),
+    ("ac_control", "set_temperature", {"temperature": ["18", "21", "24"]}, "Air conditioner temperature set to {temperature} degrees.", "set the ac to {temperature} degrees"),
+    ("ac_control", "set_mode", {"mode": ["cool", "fan", "dry"]}, "Air conditioner set to {mode} mode.", "switch the ac to {mode} mode"),
+    ("ac_control", "set_timer", {"time": ["1 hour", "2 hours"]}, "Air conditioner timer set to {time}.", "set the ac timer for {time}"),
+    ("refrigerator_control", "set_temperature", {"temperature": ["2", "4", "5"]}, "Refrigerator temperature set to {temperature} degrees.", "set the fridge to {temperature} degrees"),
+    ("refrigerator_control", "toggle_power_saving_mode", {"operation": ["enable", "disable"]}, "Refrigerator power-saving mode {operation}d.", "{operation} fridge power saving"),
+    ("dishwasher_control", "control_device_operation", {"operation": ["start", "stop", "pause", "resume"]}, "Dishwasher {operation}d.", "{operation} the dishwasher"),
+    ("dishwasher_control", "set_mode", {"mode": ["eco", "heavy wash", "rinse only"]}, "Dishwasher set to {mode} mode.", "set the dishwasher to {mode} mode"),
+    ("dishwasher_control", "set_timer", {"time": ["1 hour", "30 minutes"]}, "Dishwasher timer set to {time}.", "set the dishwasher timer for {time}"),
+    ("washingmachine_control", "control_device_operation", {"operation": ["start", "stop", "pause", "resume"]}, "Washing machine {operation}.", "{operation} the washing machine"),
+    ("washingmachine_control", "set_mode", {"mode": ["quick wash", "delicate", "heavy load"]}, "Washing machine set to {mode} mode.", "set the washing machine to {mode}"),
+    ("washingmachine_control", "set_timer", {"time": ["30 minutes", "1 hour"]}, "Washing machine timer set to {time}.", "set the washing machine timer for {time}"),
+]
+
+
+def _make_call(rng, entry):
+    plugin_name, function_name, arg_values, result_template, query_template = entry
+    arguments = {key: rng.choice(values) for key, values in arg_values.items()}
+    return {
+        "arguments": arguments,
+        "result": result_template.format(**arguments),
+        "function_name": function_name,
+        "plugin_name": plugin_name,
+    }, query_template.format(**arguments)
+
+
+def generate_ground_truth_item(rng, multi_intent_rate=0.1):
+    """One ground_truth.json record with one or (sometimes) two expected functions."""
+    count = 2 if rng.random() < multi_intent_rate else 1
+    calls, queries = zip(*(_make_call(rng, rng.choice(CATALOG)) for _ in range(count)))
+    return {
+        "query": " and ".join(queries),
+        "expected_response": " ".join(call["result"] for call in calls),
+        "expected_function": list(calls),
+    }
+
+
+def _to_function_result(call, index):
+    """Mimic FunctionResultContent.dict() as written to agent_predicted.json."""
+    return {
+        "ai_model_id": None,
+        "metadata": {"arguments": call["arguments"], "used_arguments": call["arguments"]},
+        "content_type": "function_result",
+        "id": f"call_mock_{index}",
+        "result": call["result"],
+        "name": f"{call['plugin_name']}-{call['function_name']}",
+        "function_name": call["function_name"],
+        "plugin_name": call["plugin_name"],
+        "encoding": None,
+    }
+
+
+def mock_predict(rng, item, error_rate=0.1):
+    """
+    Mock model backend: predict the expected functions, corrupting the arguments of a
+    fraction of calls, and attach synthetic performance numbers.
+    """
+    predicted = []
+    for index, call in enumerate(item["expected_function"]):
+        if rng.random() < error_rate:
+            call = dict(call, arguments={key: f"{value}x" for key, value in call["arguments"].items()})
+        predicted.append(_to_function_result(call, index))
+
+    total_latency = round(rng.lognormvariate(6.5, 0.4), 2)
+    return dict(
+        item,
+        predicted_function=predicted,
+        predicted_response=item["expected_response"],
+        performance={
+            "time_to_first_token_ms": round(total_latency * rng.uniform(0.5, 0.8), 2),
+            "total_latency_ms": total_latency,
+            "tool_call_rounds": 1,
+            "prompt_tokens": rng.randint(600, 900),
+            "completion_tokens": rng.randint(20, 60),
+        },
+    )
+
+
+def write_json_array(path, items):
+    """Stream an iterable of records to a JSON array file without building the full string."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for item in items:
+            if count:
+                f.write(",\n")
+            f.write(json.dumps(item))
+            count += 1
+        f.write("\n]")
+    return count
+
+
+def generate_datasets(num_rows, ground_truth_path, predicted_path, seed=0, error_rate=0.1):
+    """Write synthetic ground_truth.json and agent_predicted.json files with `num_rows` records."""
+    rng = random.Random(seed)
+    ground_truth = [generate_ground_truth_item(rng) for _ in range(num_rows)]
+    write_json_array(ground_truth_path, ground_truth)
+    write_json_array(predicted_path, (mock_predict(rng, item, error_rate) for item in ground_truth))
@@ -0,0 +1 @@
+# Initialize the dashboard package
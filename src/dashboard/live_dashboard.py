@@ -0,0 +1,206 @@
+import json
+import os
+import sys
+from collections import deque
+from pathlib import Path
+
+# Started with `streamlit run`, so put src/ and the step folders on the path first
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SRC_PATH)
+sys.path.insert(0, os.path.join(SRC_PATH, 'evaluator'))
+sys.path.insert(0, os.path.join(SRC_PATH, 'datatransformer'))
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from data_transform import replace_predicted_with_mapped
+from evaluator_repo.end_to_end_function_call_eval import EndToEndFunctionCallEvaluator
+from evaluator_repo.response_similarity_eval import ResponseSimilarityEvaluator
+from local_eval import score_row, score_similarity
+from utils.load_config import load_config
+from utils.load_mapping_schema import load_mapping_schema
+from utils.logger import setup_logging
+from utils.result_stream import is_run_header
+
+ACCURACY_FIELDS = ["Plugin_name_accuracy", "Function_name_accuracy", "Arguments_accuracy", "Overall_accuracy"]
+
+
+class JsonlTailer:
+    """
+    Reads records appended to a JSONL file since the last call, tracking the byte offset.
+    A trailing line without a newline is held back until it is complete. Generation starts
+    each run's file with a run header line; when the first line changes (or the file
+    shrinks), a new run has replaced the file and it is read again from the start.
+    """
+
+    def __init__(self, path, max_bytes=8 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self.first_line = None
+
+    def _first_line(self):
+        with open(self.path, "rb") as f:
+            line = f.readline()
+        return line if line.endswith(b"\n") else None
+
+    def read_new(self):
+        """Returns (records, reset); reset is True when a new run replaced the file."""
+        if not os.path.exists(self.path):
+            return [], False
+        first_line = self._first_line()
+        reset = self.offset > 0 and (os.path.getsize(self.path) < self.offset or first_line != self.first_line)
+        if reset:
+            self.offset = 0
+        self.first_line = first_line
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(self.max_bytes)
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return [], reset
+        self.offset += end
+
+        records = []
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not is_run_header(record):
+                    records.append(record)
+        return records, reset
+
+
+class LiveAggregates:
+    """
+    Running per-plugin accuracy and response similarity, updated one chunk at a time.
+    Latency percentiles cover the most recent `latency_window` queries per plugin and
+    overall, so each refresh sorts a bounded window rather than the whole run.
+    """
+
+    def __init__(self, recent_failures=20, latency_window=1000):
+        self.evaluator = EndToEndFunctionCallEvaluator()
+        self.similarity_evaluator = ResponseSimilarityEvaluator()
+        self.mapping_schema = load_mapping_schema()
+        self.count = 0
+        self.plugins = {}
+        self.latency_window = latency_window
+        self.latencies = {}
+        self.recent_latencies = deque(maxlen=latency_window)
+        self.failures = deque(maxlen=recent_failures)
+
+    def add(self, records):
+        """Transform and score newly appended generation records and fold them into the totals."""
+        if not records:
+            return
+        transformed = replace_predicted_with_mapped(records, self.mapping_schema)
+        similarities = score_similarity(self.similarity_evaluator, transformed)
+        for item, similarity in zip(transformed, similarities):
+            outputs = score_row(self.evaluator, item)
+            plugin = (item.get("expected_function") or [{}])[0].get("plugin_name") or "none"
+            totals = self.plugins.setdefault(plugin, dict.fromkeys(["queries", "Response_similarity", *ACCURACY_FIELDS], 0))
+            totals["queries"] += 1
+            totals["Response_similarity"] += similarity
+            for field in ACCURACY_FIELDS:
+                totals[field] += bool(outputs[field])
+
+            latency = (item.get("performance") or {}).get("total_latency_ms")
+            if latency is not None:
+                self.latencies.setdefault(plugin, deque(maxlen=self.latency_window)).append(latency)
+                self.recent_latencies.append(latency)
+            if not outputs["Overall_accuracy"]:
+                self.failures.append({
+                    "query": item.get("query"),
+                    "expected": [f"{f.get('plugin_name')}-{f.get('function_name')}" for f in item.get("expected_function") or []],
+                    "predicted": [f"{f.get('plugin_name')}-{f.get('function_name')}" for f in item.get("predicted_function") or []],
+                })
+            self.count += 1
+
+    def plugin_table(self):
+        rows = []
+        for plugin, totals in sorted(self.plugins.items()):
+            row = {"plugin": plugin, "queries": totals["queries"]}
+            row.update({field: totals[field] / totals["queries"] for field in ["Response_similarity", *ACCURACY_FIELDS]})
+            latencies = self.latencies.get(plugin)
+            if latencies:
+                row["p50_latency_ms"], row["p90_latency_ms"], row["p99_latency_ms"] = np.percentile(latencies, [50, 90, 99])
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def overall(self):
+        if not self.count:
+            return {}
+        overall = {field: sum(t[field] for t in self.plugins.values()) / self.count for field in ACCURACY_FIELDS}
+        if self.recent_latencies:
+            overall["p50_latency_ms"], overall["p90_latency_ms"] = np.percentile(self.recent_latencies, [50, 90])
+        return overall
+
+
+def get_dashboard_config():
+    config = load_config()
+    dashboard_config = config["dashboard"]
+    dataset_path = Path(__file__).resolve().parents[1]
+    input_file = os.path.join(dataset_path, dashboard_config["input_path"], dashboard_config["input_file"])
+    return dashboard_config, input_file
+
+
+def new_aggregates(dashboard_config):
+    return LiveAggregates(dashboard_config.get("recent_failures", 20), dashboard_config.get("latency_window", 1000))
+
+
+def render(dashboard_config, input_file):
+    state = st.session_state
+    if "tailer" not in state:
+        state.tailer = JsonlTailer(input_file, dashboard_config.get("max_bytes_per_refresh", 8 * 1024 * 1024))
+        state.aggregates = new_aggregates(dashboard_config)
+
+    records, reset = state.tailer.read_new()
+    if reset:
+        state.aggregates = new_aggregates(dashboard_config)
+    state.aggregates.add(records)
+    aggregates = state.aggregates
+
+    if not aggregates.count:
+        st.info(f"Waiting for results in {input_file}")
+        return
+
+    overall = aggregates.overall()
+    columns = st.columns(4)
+    columns[0].metric("Queries scored", aggregates.count, delta=len(records) or None)
+    columns[1].metric("Overall accuracy", f"{overall['Overall_accuracy']:.1%}")
+    columns[2].metric("p50 latency", f"{overall['p50_latency_ms']:.0f} ms" if "p50_latency_ms" in overall else "-")
+    columns[3].metric("p90 latency", f"{overall['p90_latency_ms']:.0f} ms" if "p90_latency_ms" in overall else "-")
+
+    table = aggregates.plugin_table()
+    st.subheader("Accuracy by plugin")
+    chart = px.bar(table, x="plugin", y="Overall_accuracy", text=table["Overall_accuracy"].map(lambda x: f"{x:.0%}"))
+    chart.update_layout(yaxis_tickformat=",.0%", yaxis_range=[0, 1], yaxis_title="Overall accuracy")
+    st.plotly_chart(chart, width="stretch")
+    st.dataframe(table, hide_index=True, width="stretch")
+
+    st.subheader("Recent failures")
+    st.dataframe(pd.DataFrame(list(aggregates.failures)[::-1]), hide_index=True, width="stretch")
+    st.caption(f"Read up to byte {state.tailer.offset:,} of {input_file}")
+
+
+def main():
+    setup_logging()
+    st.set_page_config(page_title="Live evaluation dashboard", layout="wide")
+    st.title("Live evaluation dashboard")
+    dashboard_config, input_file = get_dashboard_config()
+
+    # Only the fragment reruns on the timer; each run reads just the bytes appended since the last
+    @st.fragment(run_every=dashboard_config.get("refresh_seconds", 2))
+    def live_results():
+        render(dashboard_config, input_file)
+
+    live_results()
+
+
+if __name__ == "__main__":
+    main()
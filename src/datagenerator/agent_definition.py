@@ -0,0 +1,29 @@
+from semantic_kernel.kernel import Kernel
+
+from plugins.control_plugins import (
+    TVControlPlugin,
+    ACControlPlugin,
+    RefrigeratorControlPlugin,
+    DishwasherControlPlugin,
+    WashingMachineControlPlugin
+)
+
+AGENT_NAME = "GAI_DEVICE_CONTROL"
+AGENT_INSTRUCTIONS = "Answer questions about device control and perform the requested actions."
+
+# Plugin name -> plugin class, registered on every kernel the data generator builds
+DEVICE_PLUGINS = {
+    "tv_control": TVControlPlugin,
+    "ac_control": ACControlPlugin,
+    "refrigerator_control": RefrigeratorControlPlugin,
+    "dishwasher_control": DishwasherControlPlugin,
+    "washingmachine_control": WashingMachineControlPlugin,
+}
+
+
+def build_kernel():
+    """Create a Semantic Kernel with all device control plugins registered."""
+    kernel = Kernel()
+    for plugin_name, plugin_class in DEVICE_PLUGINS.items():
+        kernel.add_plugin(plugin_class(), plugin_name=plugin_name)
+    return kernel
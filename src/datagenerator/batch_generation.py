@@ -0,0 +1,357 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+from semantic_kernel.connectors.ai.function_calling_utils import kernel_function_metadata_to_function_call_format
+from semantic_kernel.functions import KernelArguments
+
+from agent_definition import AGENT_INSTRUCTIONS, build_kernel
+from local_batch_server import LocalBatchServer
+from plugin_router import build_router, routing_record, summarize_routing
+from trajectory import trajectory_call
+
+from utils.http_transport import create_azure_openai_client, get_async_http_client
+from utils.load_config import load_config
+from utils.logger import logger, setup_logging
+from utils.result_stream import append_result, open_result_stream
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Load environment variables from .env file
+load_dotenv(override=True)
+
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_tools(kernel):
+    """Chat completion tool schemas for every registered plugin function."""
+    return [
+        kernel_function_metadata_to_function_call_format(metadata)
+        for metadata in kernel.get_full_list_of_function_metadata()
+    ]
+
+
+def function_result_item(call_id, plugin_name, function_name, arguments, result):
+    """A predicted function entry in the FunctionResultContent.dict() shape of agent_predicted.json."""
+    return {
+        "ai_model_id": None,
+        "metadata": {"arguments": arguments, "used_arguments": arguments},
+        "content_type": "function_result",
+        "id": call_id,
+        "result": result,
+        "name": f"{plugin_name}-{function_name}",
+        "function_name": function_name,
+        "plugin_name": plugin_name,
+        "encoding": None,
+    }
+
+
+async def resolve_tool_call(kernel, tool_call):
+    """Invoke one requested tool call on the local kernel. Returns (tool message, result item, duration in ms)."""
+    plugin_name, _, function_name = tool_call["function"]["name"].partition("-")
+    arguments = {}
+    start = time.perf_counter()
+    try:
+        arguments = json.loads(tool_call["function"].get("arguments") or "{}")
+        function_result = await kernel.invoke(
+            plugin_name=plugin_name,
+            function_name=function_name,
+            arguments=KernelArguments(**arguments),
+        )
+        result = str(function_result.value) if function_result is not None else ""
+    except Exception as e:
+        result = f"Error invoking {plugin_name}-{function_name}: {e}"
+        logger.warning(result)
+
+    duration_ms = round((time.perf_counter() - start) * 1000, 2)
+    message = {"role": "tool", "tool_call_id": tool_call["id"], "content": result}
+    return message, function_result_item(tool_call["id"], plugin_name, function_name, arguments, result), duration_ms
+
+
+class BatchJobRunner:
+    """Submits chat completion requests as file-based batch jobs and polls them to completion."""
+
+    def __init__(self, client, work_dir, completion_window="24h", poll_interval_seconds=30):
+        self.client = client
+        self.work_dir = work_dir
+        self.completion_window = completion_window
+        self.poll_interval_seconds = poll_interval_seconds
+
+    async def _wait_for_file(self, file_id):
+        file_obj = await self.client.files.retrieve(file_id)
+        while file_obj.status not in ("processed", "error"):
+            await asyncio.sleep(self.poll_interval_seconds)
+            file_obj = await self.client.files.retrieve(file_id)
+        if file_obj.status == "error":
+            raise RuntimeError(f"Batch input file {file_id} failed validation.")
+
+    async def run(self, requests, name):
+        """
+        Run one batch of {custom_id: request body} and return {custom_id: response body}.
+        Requests that failed inside the batch are logged and left out of the result.
+        """
+        input_path = os.path.join(self.work_dir, f"{name}.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for custom_id, body in requests.items():
+                f.write(json.dumps({"custom_id": custom_id, "method": "POST", "url": "/chat/completions", "body": body}) + "\n")
+
+        with open(input_path, "rb") as f:
+            input_file = await self.client.files.create(file=f, purpose="batch")
+        await self._wait_for_file(input_file.id)
+
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/chat/completions",
+            completion_window=self.completion_window,
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(requests)} requests ({name}).")
+
+        while batch.status not in TERMINAL_BATCH_STATUSES:
+            await asyncio.sleep(self.poll_interval_seconds)
+            batch = await self.client.batches.retrieve(batch.id)
+            logger.info(f"Batch {batch.id} status: {batch.status}")
+
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}.")
+
+        responses = {}
+        if batch.output_file_id:
+            output = await self.client.files.content(batch.output_file_id)
+            output_path = os.path.join(self.work_dir, f"{name}_output.jsonl")
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(output.text)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    responses[record["custom_id"]] = response["body"]
+                else:
+                    logger.error(f"Batch request {record['custom_id']} failed: {record.get('error') or response}")
+
+        if batch.error_file_id:
+            errors = await self.client.files.content(batch.error_file_id)
+            for line in errors.text.splitlines():
+                if line.strip():
+                    logger.error(f"Batch request error: {line}")
+
+        return responses
+
+
+async def generate_batch(items, query_key, kernel, runner, deployment, max_tool_rounds=3, router=None,
+                         on_complete=None):
+    """
+    Generate predictions for all ground truth items through batch jobs. Each round submits
+    every unfinished conversation as one batch; tool calls in the responses are resolved
+    locally (concurrently within a round) and fed back in the next round. With a router,
+    each conversation only carries the tool schemas of its candidate plugins. `on_complete`
+    is called with each result as soon as its conversation finishes.
+    """
+    tools = build_tools(kernel)
+    conversations = {}
+    conversation_tools = {}
+    outputs = {}
+    for index, item in enumerate(items):
+        custom_id = f"query-{index}"
+        conversations[custom_id] = [
+            {"role": "system", "content": AGENT_INSTRUCTIONS},
+            {"role": "user", "content": item[query_key]},
+        ]
+        outputs[custom_id] = {
+            "query": item[query_key],
+            "expected_response": item.get("expected_response", ""),
+            "expected_function": item.get("expected_function", []),
+            "performance": {
+                "time_to_first_token_ms": None,
+                "total_latency_ms": None,
+                "tool_call_rounds": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            },
+        }
+        conversation_tools[custom_id] = tools
+        if router is not None:
+            candidate_plugins = router.route(item[query_key])
+            outputs[custom_id]["routing"] = routing_record(router, candidate_plugins, outputs[custom_id]["expected_function"])
+            conversation_tools[custom_id] = [
+                tool for tool in tools if tool["function"]["name"].partition("-")[0] in candidate_plugins
+            ]
+
+    pending = list(conversations)
+    for round_index in range(max_tool_rounds + 1):
+        if not pending:
+            break
+        requests = {}
+        for custom_id in pending:
+            body = {"model": deployment, "messages": conversations[custom_id]}
+            # The last round withholds tools so every conversation ends with a text answer
+            if round_index < max_tool_rounds:
+                body["tools"] = conversation_tools[custom_id]
+                body["parallel_tool_calls"] = True
+            requests[custom_id] = body
+        responses = await runner.run(requests, f"batch_round_{round_index}")
+
+        next_pending = []
+        for custom_id in pending:
+            body = responses.get(custom_id)
+            if body is None:
+                continue
+            output_data = outputs[custom_id]
+            usage = body.get("usage") or {}
+            output_data["performance"]["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            output_data["performance"]["completion_tokens"] += usage.get("completion_tokens", 0)
+
+            message = body["choices"][0]["message"]
+            tool_calls = message.get("tool_calls") or []
+            if tool_calls:
+                conversations[custom_id].append(
+                    {"role": "assistant", "content": message.get("content"), "tool_calls": tool_calls}
+                )
+                resolved = await asyncio.gather(*(resolve_tool_call(kernel, call) for call in tool_calls))
+                calls = []
+                for tool_message, result_item, duration_ms in resolved:
+                    conversations[custom_id].append(tool_message)
+                    output_data.setdefault("predicted_function", []).append(result_item)
+                    calls.append(trajectory_call(
+                        result_item["plugin_name"], result_item["function_name"],
+                        result_item["metadata"]["arguments"], result_item["result"], duration_ms,
+                    ))
+                output_data.setdefault("trajectory", []).append({"round": round_index, "calls": calls})
+                output_data["performance"]["tool_call_rounds"] += 1
+                next_pending.append(custom_id)
+            elif message.get("content"):
+                output_data["predicted_response"] = message["content"]
+
+        if on_complete is not None:
+            continuing = set(next_pending)
+            for custom_id in pending:
+                if custom_id not in continuing:
+                    on_complete(outputs[custom_id])
+        pending = next_pending
+
+    # Conversations still asking for tools after the last round are finished as they are
+    if on_complete is not None:
+        for custom_id in pending:
+            on_complete(outputs[custom_id])
+
+    return [outputs[custom_id] for custom_id in conversations]
+
+
+def get_deployment(batch_config):
+    """
+    Model deployment for the batch requests. The azure backend needs the deployment from the
+    environment; failing here beats a remote error after the request file was uploaded.
+    """
+    deployment_env = batch_config["deployment_env"]
+    deployment = os.environ.get(deployment_env)
+    if batch_config.get("backend", "azure") == "local":
+        return deployment or "local-batch"
+    if not deployment:
+        raise ValueError(
+            f"{deployment_env} is not set. Set it to the Azure OpenAI batch deployment name, "
+            "or use data_generation.batch.backend: local for a dry run."
+        )
+    return deployment
+
+
+def create_client(batch_config):
+    """Create the OpenAI client for the configured batch backend. Returns (client, local server or None)."""
+    if batch_config.get("backend", "azure") == "local":
+        logger.warning(
+            "data_generation.batch.backend is 'local': predictions come from the keyword-matching "
+            "LocalBatchServer stand-in, NOT from a model. Do not use these results for evaluation."
+        )
+        server = LocalBatchServer().start()
+        return AsyncOpenAI(base_url=server.base_url, api_key="local", http_client=get_async_http_client()), server
+
+    return create_azure_openai_client(), None
+
+
+async def main():
+    try:
+        config = load_config()
+        if config is None:
+            raise ValueError("Configuration file not loaded properly.")
+        generation_config = config["data_generation"]
+        batch_config = generation_config["batch"]
+        logger.info("Configuration loaded successfully.")
+    except Exception as e:
+        logger.exception("Failed to load configuration.")
+        return
+
+    try:
+        dataset_path = Path(__file__).resolve().parents[1]
+        input_file = os.path.join(dataset_path, generation_config["input_path"], generation_config["input_file"])
+        output_file = os.path.join(dataset_path, generation_config["output_path"], generation_config["output_file"])
+        output_file_jsonl = os.path.join(
+            dataset_path, generation_config["output_path"], generation_config.get("output_file_jsonl", "agent_predicted.jsonl")
+        )
+        work_dir = os.path.join(dataset_path, batch_config["work_path"])
+        num_of_queries = generation_config["num_of_queries"]
+        query_key = generation_config["query_key"]
+        deployment = get_deployment(batch_config)
+    except KeyError as e:
+        logger.exception(f"Missing key in config: {e}")
+        return
+    except ValueError as e:
+        logger.error(str(e))
+        return
+
+    try:
+        with open(input_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        items = [item for item in data if query_key in item]
+        if num_of_queries != "all":
+            items = items[:num_of_queries]
+        logger.info(f"Loaded {len(items)} queries from {input_file}")
+    except Exception as e:
+        logger.exception(f"Failed to read input file: {input_file}")
+        return
+
+    server = None
+    try:
+        os.makedirs(work_dir, exist_ok=True)
+        client, server = create_client(batch_config)
+        runner = BatchJobRunner(
+            client,
+            work_dir,
+            completion_window=batch_config.get("completion_window", "24h"),
+            # The local stand-in completes a batch on its first status poll
+            poll_interval_seconds=0.1 if server else batch_config.get("poll_interval_seconds", 30),
+        )
+        kernel = build_kernel()
+        # One line per result as its conversation finishes, so the live dashboard can follow the run
+        with open_result_stream(output_file_jsonl) as jsonl_file:
+            all_results = await generate_batch(
+                items, query_key, kernel, runner, deployment, batch_config.get("max_tool_rounds", 3),
+                router=build_router(kernel, generation_config.get("routing")),
+                on_complete=lambda output_data: append_result(jsonl_file, output_data),
+            )
+        routing_summary = summarize_routing(all_results)
+        if routing_summary:
+            logger.info(f"Routing summary: {routing_summary}")
+    except Exception as e:
+        logger.exception("Error during batch generation.")
+        return
+    finally:
+        if server is not None:
+            server.stop()
+
+    try:
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as json_file:
+            json.dump(all_results, json_file, indent=2)
+        logger.info(f"Results written to {output_file}")
+    except Exception as e:
+        logger.exception("Failed to write output file.")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -2,6 +2,7 @@ import asyncio
 import json
 import sys
 import os
+import time
 from pathlib import Path
 import yaml
 from dotenv import load_dotenv
@@ -9,22 +10,21 @@ from dotenv import load_dotenv
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.connectors.ai import FunctionChoiceBehavior
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from semantic_kernel.connectors.ai.open_ai.const import DEFAULT_AZURE_API_VERSION
 from semantic_kernel.contents import ChatHistory
 from semantic_kernel.contents.function_call_content import FunctionCallContent
 from semantic_kernel.contents.function_result_content import FunctionResultContent
+from semantic_kernel.filters.filter_types import FilterTypes
 from semantic_kernel.functions import KernelArguments
-from semantic_kernel.kernel import Kernel
-
-from plugins.control_plugins import (
-    TVControlPlugin,
-    ACControlPlugin,
-    RefrigeratorControlPlugin,
-    DishwasherControlPlugin,
-    WashingMachineControlPlugin
-)
 
+from agent_definition import AGENT_INSTRUCTIONS, AGENT_NAME, build_kernel
+from plugin_router import build_router, routing_record, summarize_routing
+from trajectory import TrajectoryRecorder, record_function_invocation
+
+from utils.http_transport import create_azure_openai_client
 from utils.load_config import load_config
-from utils.logger import logger 
+from utils.logger import logger, setup_logging
+from utils.result_stream import append_result, open_result_stream
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -37,25 +37,26 @@ load_dotenv(override=True)
 setup_telemetry()
 
 # Initialize Semantic Kernel and register plugins
-kernel = Kernel()
-kernel.add_plugin(TVControlPlugin(), plugin_name="tv_control")
-kernel.add_plugin(ACControlPlugin(), plugin_name="ac_control")
-kernel.add_plugin(RefrigeratorControlPlugin(), plugin_name="refrigerator_control")
-kernel.add_plugin(DishwasherControlPlugin(), plugin_name="dishwasher_control")
-kernel.add_plugin(WashingMachineControlPlugin(), plugin_name="washingmachine_control")
+kernel = build_kernel()
+# Times every tool call into the trajectory of the query being answered
+kernel.add_filter(FilterTypes.AUTO_FUNCTION_INVOCATION, record_function_invocation)
 
 # Register chat completion service
 service_id = "agent"
-chat_completion_service = AzureChatCompletion(service_id=service_id)
+# Pooled keep-alive HTTP client and token cache shared with every other client in the process
+chat_completion_service = AzureChatCompletion(
+    service_id=service_id,
+    async_client=create_azure_openai_client(os.environ.get("AZURE_OPENAI_API_VERSION", DEFAULT_AZURE_API_VERSION)),
+)
 kernel.add_service(chat_completion_service)
 
 # Configure settings
 settings = kernel.get_prompt_execution_settings_from_service_id(service_id=service_id)
 settings.function_choice_behavior = FunctionChoiceBehavior.Auto()
+# Independent calls (e.g. two devices in one command) come back in one round and run concurrently
+settings.parallel_tool_calls = True
 
 # Define the agent
-AGENT_NAME = "GAI_DEVICE_CONTROL"
-AGENT_INSTRUCTIONS = "Answer questions about device control and perform the requested actions."
 agent = ChatCompletionAgent(
     kernel=kernel,
     name=AGENT_NAME,
@@ -63,6 +64,103 @@ agent = ChatCompletionAgent(
     arguments=KernelArguments(settings=settings),
 )
 
+def routed_settings(candidate_plugins):
+    """Execution settings that expose only the functions of the candidate plugins."""
+    routed = kernel.get_prompt_execution_settings_from_service_id(service_id=service_id)
+    routed.function_choice_behavior = FunctionChoiceBehavior.Auto(filters={"included_plugins": candidate_plugins})
+    routed.parallel_tool_calls = True
+    return routed
+
+
+def _add_usage(performance, usage):
+    """Accumulate prompt/completion token counts from a chunk's usage metadata."""
+    if usage is None:
+        return
+    for key in ("prompt_tokens", "completion_tokens"):
+        value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+        if value:
+            performance[key] = (performance[key] or 0) + value
+
+
+async def run_query(chat_history, user_input, candidate_plugins=None):
+    """
+    Send one query through the agent and capture the predicted functions of every round,
+    the tool-call trajectory, the response text and per-query performance: time to first
+    token, total latency, number of tool-call rounds and prompt/completion token usage (None
+    when the service reports no usage). With `candidate_plugins`, only those plugins'
+    functions are offered to the model.
+    """
+    chat_history.add_user_message(user_input)
+    response_content = ""
+    predicted_function = None
+    performance = {
+        "time_to_first_token_ms": None,
+        "total_latency_ms": None,
+        "tool_call_rounds": 0,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+    }
+
+    # Routed settings are passed on every call: the agent merges them into its own defaults
+    arguments = KernelArguments(settings=routed_settings(candidate_plugins)) if candidate_plugins is not None else None
+
+    in_tool_results = False
+    start = time.perf_counter()
+    with TrajectoryRecorder() as recorder:
+        async for content in agent.invoke_stream(chat_history, arguments=arguments):
+            _add_usage(performance, (content.metadata or {}).get("usage"))
+
+            results = [i.dict() for i in content.items if isinstance(i, FunctionResultContent)]
+            if results:
+                # Later rounds add to the earlier ones instead of replacing them
+                predicted_function = (predicted_function or []) + results
+                # Results of one round arrive back to back; count each contiguous group once
+                if not in_tool_results:
+                    performance["tool_call_rounds"] += 1
+                in_tool_results = True
+            else:
+                in_tool_results = False
+
+            if not any(isinstance(i, (FunctionCallContent, FunctionResultContent)) for i in content.items) and content.content.strip():
+                if performance["time_to_first_token_ms"] is None:
+                    performance["time_to_first_token_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                response_content += content.content
+    performance["total_latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    return predicted_function, recorder.rounds(), response_content, performance
+
+
+async def process_item(chat_history, item, query_key, router=None):
+    """Run one ground truth item through the agent and build its agent_predicted.json record."""
+    user_input = item[query_key]
+    output_data = {
+        "query": user_input,
+        "expected_response": item.get("expected_response", ""),
+        "expected_function": item.get("expected_function", [])
+    }
+
+    candidate_plugins = None
+    if router is not None:
+        candidate_plugins = router.route(user_input)
+        output_data["routing"] = routing_record(router, candidate_plugins, output_data["expected_function"])
+        logger.info(f"Routing: {output_data['routing']}")
+
+    predicted_function, trajectory, response_content, performance = await run_query(chat_history, user_input, candidate_plugins)
+    if predicted_function is not None:
+        output_data["predicted_function"] = predicted_function
+    if trajectory:
+        output_data["trajectory"] = trajectory
+
+    if response_content:
+        output_data["predicted_response"] = response_content
+        logger.info(f"Query: {output_data['query']}")
+        logger.info(f"Response: {output_data['predicted_response']}")
+
+    output_data["performance"] = performance
+    logger.info(f"Performance: {performance}")
+    return output_data
+
+
 async def main():
     try:
         config = load_config()
@@ -85,8 +183,14 @@ async def main():
             config["data_generation"]["output_path"],
             config["data_generation"]["output_file"]
         )
+        output_file_jsonl = os.path.join(
+            dataset_path,
+            config["data_generation"]["output_path"],
+            config["data_generation"].get("output_file_jsonl", "agent_predicted.jsonl")
+        )
         num_of_queries = config["data_generation"]["num_of_queries"]
         query_key = config["data_generation"]["query_key"]
+        router = build_router(kernel, config["data_generation"].get("routing"))
     except KeyError as e:
         logger.exception(f"Missing key in config: {e}")
         return
@@ -103,37 +207,23 @@ async def main():
     all_results = []
 
     try:
-        for item in data:
-            if query_key in item:
-                user_input = item[query_key]
-                if num_of_queries != "all" and len(all_results) >= num_of_queries:
-                    break
-
-                chat_history.add_user_message(user_input)
-                response_content = ""
-                output_data = {
-                    "query": user_input,
-                    "expected_response": item.get("expected_response", ""),
-                    "expected_function": item.get("expected_function", [])
-                }
-
-                async for content in agent.invoke_stream(chat_history):
-                    if any(isinstance(i, FunctionResultContent) for i in content.items):
-                        output_data["predicted_function"] = [i.dict() for i in content.items]
-
-                    if not any(isinstance(i, (FunctionCallContent, FunctionResultContent)) for i in content.items) and content.content.strip():
-                        response_content += content.content
-
-                if response_content:
-                    output_data["predicted_response"] = response_content
-                    logger.info(f"Query: {output_data['query']}")
-                    logger.info(f"Response: {output_data['predicted_response']}")
-
-                all_results.append(output_data)
+        # One line per result as it completes, so the live dashboard can follow the run
+        with open_result_stream(output_file_jsonl) as jsonl_file:
+            for item in data:
+                if query_key in item:
+                    if num_of_queries != "all" and len(all_results) >= num_of_queries:
+                        break
+
+                    output_data = await process_item(chat_history, item, query_key, router)
+                    all_results.append(output_data)
+                    append_result(jsonl_file, output_data)
     except Exception as e:
         logger.exception("Error during agent processing.")
         return
 
+    if router is not None:
+        logger.info(f"Routing summary: {summarize_routing(all_results)}")
+
     try:
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         with open(output_file, 'w', encoding='utf-8') as json_file:
@@ -143,4 +233,5 @@ async def main():
         logger.exception("Failed to write output file.")
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(main())
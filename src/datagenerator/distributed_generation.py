@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Workers are started as scripts, so put src/ on the path before importing pipeline modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from utils.load_config import load_config
+from utils.logger import logger, setup_logging
+from utils.result_stream import append_result, open_result_stream
+from plugin_router import summarize_routing
+from work_queue import WorkQueue
+
+
+def get_queue_path(config):
+    """Resolve the work queue database path from config."""
+    distributed_config = config["data_generation"]["distributed"]
+    dataset_path = Path(__file__).resolve().parents[1]
+    return os.path.join(dataset_path, distributed_config["queue_path"], distributed_config["queue_file"])
+
+
+def open_queue(queue_path, distributed_config):
+    return WorkQueue(
+        queue_path,
+        max_attempts=distributed_config.get("max_attempts", 3),
+        journal_mode=distributed_config.get("journal_mode", "WAL"),
+    )
+
+
+async def run_worker(queue, worker_id, query_key, concurrency=4, lease_seconds=120, poll_interval_seconds=2,
+                     routing_config=None):
+    """
+    Pull items from the queue and run them through the agent until the queue is drained.
+    Up to `concurrency` items are processed at once, each with its own chat history, and
+    their leases are renewed while in flight. A new item is claimed as soon as a slot
+    frees up, so one slow query never holds the other slots idle.
+    """
+    # Imported here so the coordinator does not need the chat completion service
+    from semantic_kernel.contents import ChatHistory
+    from device_control_agent import kernel, process_item
+    from plugin_router import build_router
+
+    router = build_router(kernel, routing_config)
+
+    in_flight = set()
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            await asyncio.to_thread(queue.extend_leases, worker_id, list(in_flight), lease_seconds)
+
+    async def handle(position, item):
+        in_flight.add(position)
+        try:
+            result = await process_item(ChatHistory(), item, query_key, router)
+            await asyncio.to_thread(queue.complete, position, result)
+        except Exception as e:
+            logger.exception(f"Worker {worker_id} failed on item {position}.")
+            await asyncio.to_thread(queue.fail, position, e)
+        finally:
+            in_flight.discard(position)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    tasks = set()
+    processed = 0
+    try:
+        while True:
+            free_slots = concurrency - len(tasks)
+            claimed = await asyncio.to_thread(queue.claim, worker_id, lease_seconds, free_slots)
+            tasks.update(asyncio.create_task(handle(position, item)) for position, item in claimed)
+            if not tasks:
+                if await asyncio.to_thread(queue.is_drained):
+                    break
+                # Other workers hold the remaining leases; wait in case they expire
+                await asyncio.sleep(poll_interval_seconds)
+                continue
+            # Claim again when a slot frees up; with slots left empty, also re-poll periodically
+            timeout = poll_interval_seconds if len(claimed) < free_slots else None
+            done, tasks = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            processed += len(done)
+    finally:
+        heartbeat_task.cancel()
+        for task in tasks:
+            task.cancel()
+
+    logger.info(f"Worker {worker_id} finished after processing {processed} items.")
+    return processed
+
+
+def merge_results(queue):
+    """Merge finished items back into ground-truth order; failed items keep their inputs and error."""
+    all_results = []
+    for position, item, status, result, error in queue.items():
+        if status == "done":
+            all_results.append(result)
+        else:
+            all_results.append({
+                "query": item.get("query"),
+                "expected_response": item.get("expected_response", ""),
+                "expected_function": item.get("expected_function", []),
+                "error": error or f"item not completed (status: {status})",
+            })
+    return all_results
+
+
+def append_completed(queue, written, jsonl_file):
+    """Append results completed since the last call to the JSONL stream, one line per item."""
+    for position, result in queue.completed_results(written):
+        append_result(jsonl_file, result)
+        written.add(position)
+
+
+def start_local_workers(count, queue_path):
+    """Start worker processes on this host that share the coordinator's queue file."""
+    host = socket.gethostname()
+    return [
+        subprocess.Popen([
+            sys.executable, os.path.abspath(__file__), "worker",
+            "--queue", queue_path,
+            "--worker-id", f"{host}-{os.getpid()}-{index}",
+        ])
+        for index in range(count)
+    ]
+
+
+def main():
+    try:
+        config = load_config()
+        if config is None:
+            raise ValueError("Configuration file not loaded properly.")
+        generation_config = config["data_generation"]
+        distributed_config = generation_config["distributed"]
+        logger.info("Configuration loaded successfully.")
+    except Exception as e:
+        logger.exception("Failed to load configuration.")
+        return
+
+    try:
+        dataset_path = Path(__file__).resolve().parents[1]
+        input_file = os.path.join(dataset_path, generation_config["input_path"], generation_config["input_file"])
+        output_file = os.path.join(dataset_path, generation_config["output_path"], generation_config["output_file"])
+        output_file_jsonl = os.path.join(
+            dataset_path, generation_config["output_path"], generation_config.get("output_file_jsonl", "agent_predicted.jsonl")
+        )
+        queue_path = get_queue_path(config)
+        num_of_queries = generation_config["num_of_queries"]
+        query_key = generation_config["query_key"]
+    except KeyError as e:
+        logger.exception(f"Missing key in config: {e}")
+        return
+
+    try:
+        with open(input_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        items = [item for item in data if query_key in item]
+        if num_of_queries != "all":
+            items = items[:num_of_queries]
+        logger.info(f"Loaded {len(items)} queries from {input_file}")
+    except Exception as e:
+        logger.exception(f"Failed to read input file: {input_file}")
+        return
+
+    with open_queue(queue_path, distributed_config) as queue:
+        enqueued = queue.enqueue(items)
+        logger.info(f"Enqueued {len(items)} items into {queue_path}: {enqueued['added']} new, "
+                    f"{enqueued['changed']} changed and {enqueued['retried']} failed items reset, "
+                    f"{enqueued['removed']} stale items removed.")
+
+        workers = start_local_workers(distributed_config.get("num_local_workers", 0), queue_path)
+        logger.info(f"Started {len(workers)} local workers; remote workers can join with: "
+                    f"python {os.path.abspath(__file__)} worker --queue {queue_path}")
+
+        poll_interval = distributed_config.get("poll_interval_seconds", 2)
+        # Completed items are appended as they finish, so the live dashboard can follow the run
+        written = set()
+        with open_result_stream(output_file_jsonl) as jsonl_file:
+            try:
+                while not queue.is_drained():
+                    time.sleep(poll_interval)
+                    append_completed(queue, written, jsonl_file)
+                    logger.info(f"Work queue progress: {queue.counts()}")
+                    if workers and all(w.poll() is not None for w in workers) and any(w.returncode for w in workers):
+                        logger.error("All local workers exited and at least one failed; merging partial results.")
+                        break
+            finally:
+                for worker in workers:
+                    worker.wait()
+            append_completed(queue, written, jsonl_file)
+
+        all_results = merge_results(queue)
+        counts = queue.counts()
+
+    routing_summary = summarize_routing(all_results)
+    if routing_summary:
+        logger.info(f"Routing summary: {routing_summary}")
+
+    try:
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as json_file:
+            json.dump(all_results, json_file, indent=2)
+        logger.info(f"Results written to {output_file}")
+    except Exception as e:
+        logger.exception("Failed to write output file.")
+        return
+
+    # A fully completed run starts the next one from a fresh queue; incomplete runs resume
+    if set(counts) == {"done"}:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(queue_path + suffix):
+                os.remove(queue_path + suffix)
+        logger.info(f"Removed completed work queue {queue_path}")
+
+
+def worker_main(args):
+    setup_logging(per_process=True)
+    config = load_config()
+    generation_config = config["data_generation"]
+    distributed_config = generation_config["distributed"]
+    queue_path = args.queue or get_queue_path(config)
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    with open_queue(queue_path, distributed_config) as queue:
+        asyncio.run(run_worker(
+            queue,
+            worker_id,
+            generation_config["query_key"],
+            concurrency=distributed_config.get("worker_concurrency", 4),
+            lease_seconds=distributed_config.get("lease_seconds", 120),
+            poll_interval_seconds=distributed_config.get("poll_interval_seconds", 2),
+            routing_config=generation_config.get("routing"),
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed data generation over a shared work queue.")
+    parser.add_argument("role", choices=["coordinator", "worker"])
+    parser.add_argument("--queue", help="Path to the work queue database (default: from config.yaml).")
+    parser.add_argument("--worker-id", help="Unique worker id (default: hostname-pid).")
+    args = parser.parse_args()
+
+    if args.role == "worker":
+        worker_main(args)
+    else:
+        setup_logging()
+        main()
@@ -0,0 +1,262 @@
+import json
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Words that are taken verbatim as the value of an "operation" argument
+OPERATION_WORDS = ["on", "off", "start", "stop", "pause", "resume", "increase", "decrease", "enable", "disable"]
+STOPWORDS = {"the", "a", "an", "to", "of", "or", "and", "for", "e", "g", "set", "my", "please"}
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def _tool_score(query_words, tool):
+    """Keyword overlap between a query and a tool's name/description, weighting the plugin name."""
+    function = tool["function"]
+    plugin_key, _, function_name = function["name"].partition("-")
+    plugin_key = plugin_key.replace("_control", "")
+    joined = set(query_words) | {a + b for a, b in zip(query_words, query_words[1:])}
+
+    score = 5 if plugin_key in joined else 0
+    tool_words = set(_words(function_name.replace("_", " ")) + _words(function.get("description"))) - STOPWORDS
+    return score + len(tool_words & set(query_words))
+
+
+def _argument_value(name, query):
+    """Best-effort argument extraction from the query text."""
+    words = _words(query)
+    if name == "operation":
+        return next((w for w in words if w in OPERATION_WORDS), words[0] if words else "")
+    match = re.search(r"\b(?:to|for|on|at)\s+(.+)$", query, flags=re.IGNORECASE)
+    if match:
+        return re.sub(r"\s+(mode|degrees)$", "", match.group(1).strip(), flags=re.IGNORECASE)
+    return words[-1] if words else ""
+
+
+def _tool_calls_for(query, tools):
+    """Pick one tool per ' and '-separated intent of the query."""
+    calls = []
+    for part in re.split(r"\s+and\s+", query.strip(), flags=re.IGNORECASE):
+        query_words = _words(part)
+        best = max(tools, key=lambda tool: _tool_score(query_words, tool))
+        if _tool_score(query_words, best) == 0:
+            continue
+        properties = best["function"].get("parameters", {}).get("properties", {})
+        arguments = {name: _argument_value(name, part) for name in properties}
+        calls.append({
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": best["function"]["name"], "arguments": json.dumps(arguments)},
+        })
+    return calls
+
+
+def respond(body):
+    """
+    Keyword-based stand-in for a chat completion: the first turn calls tools chosen by
+    keyword overlap, and once tool results are present it answers with their text.
+    """
+    messages = body.get("messages", [])
+    last = messages[-1] if messages else {"role": "user", "content": ""}
+    prompt_tokens = sum(len(_words(str(m.get("content") or ""))) for m in messages) + 10 * len(body.get("tools", []))
+
+    if last.get("role") == "tool" or not body.get("tools"):
+        tool_results = []
+        for message in reversed(messages):
+            if message.get("role") != "tool":
+                break
+            tool_results.insert(0, message.get("content") or "")
+        message = {"role": "assistant", "content": " ".join(tool_results) or "Done."}
+        finish_reason = "stop"
+    else:
+        tool_calls = _tool_calls_for(last.get("content") or "", body["tools"])
+        if tool_calls:
+            message = {"role": "assistant", "content": None, "tool_calls": tool_calls}
+            finish_reason = "tool_calls"
+        else:
+            message = {"role": "assistant", "content": "I can't help with that device."}
+            finish_reason = "stop"
+
+    completion_tokens = len(_words(message.get("content") or "")) + 10 * len(message.get("tool_calls", []))
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "local-batch"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class LocalBatchServer:
+    """
+    In-process HTTP stand-in for the OpenAI/Azure OpenAI Files and Batches APIs, for dry
+    runs of the batch plumbing without a cloud endpoint. Its answers come from keyword
+    matching, not a model. Point an OpenAI client at `base_url`. Batches complete on the
+    first status poll after creation.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.files = {}
+        self.batches = {}
+        self._lock = threading.RLock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _add_file(self, content, filename, purpose):
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self.files[file_id] = {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(content),
+                "created_at": int(time.time()),
+                "filename": filename,
+                "purpose": purpose,
+                "status": "processed",
+                "content": content,
+            }
+        return self._public_file(self.files[file_id])
+
+    @staticmethod
+    def _public_file(file_obj):
+        return {k: v for k, v in file_obj.items() if k != "content"}
+
+    def _run_batch(self, batch):
+        """Execute every request line of a batch and store the output file."""
+        lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+        output = []
+        for index, line in enumerate(l for l in lines if l.strip()):
+            request = json.loads(line)
+            output.append(json.dumps({
+                "id": f"batch_req_{index}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": respond(request["body"])},
+                "error": None,
+            }))
+        output_file = self._add_file("\n".join(output).encode("utf-8"), f"{batch['id']}_output.jsonl", "batch_output")
+        batch.update(
+            status="completed",
+            output_file_id=output_file["id"],
+            completed_at=int(time.time()),
+            request_counts={"total": len(output), "completed": len(output), "failed": 0},
+        )
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload=None, raw=None):
+                data = raw if raw is not None else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/octet-stream" if raw is not None else "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _path(self):
+                path = self.path.split("?", 1)[0]
+                return re.sub(r"^/(v1|openai)", "", path).rstrip("/")
+
+            def _body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_POST(self):
+                path = self._path()
+                if path == "/files":
+                    message = BytesParser(policy=default_policy).parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + self._body()
+                    )
+                    fields, content, filename = {}, b"", "batch.jsonl"
+                    for part in message.iter_parts():
+                        name = part.get_param("name", header="content-disposition")
+                        if part.get_filename():
+                            content, filename = part.get_payload(decode=True), part.get_filename()
+                        else:
+                            fields[name] = part.get_content().strip()
+                    return self._send(200, server._add_file(content, filename, fields.get("purpose", "batch")))
+
+                if path == "/batches":
+                    request = json.loads(self._body() or b"{}")
+                    if request.get("input_file_id") not in server.files:
+                        return self._send(404, {"error": {"message": "input file not found"}})
+                    batch = {
+                        "id": f"batch_{uuid.uuid4().hex[:24]}",
+                        "object": "batch",
+                        "endpoint": request.get("endpoint", "/chat/completions"),
+                        "input_file_id": request["input_file_id"],
+                        "completion_window": request.get("completion_window", "24h"),
+                        "status": "validating",
+                        "created_at": int(time.time()),
+                        "output_file_id": None,
+                        "error_file_id": None,
+                    }
+                    with server._lock:
+                        server.batches[batch["id"]] = batch
+                    return self._send(200, batch)
+
+                self._send(404, {"error": {"message": f"unknown path {path}"}})
+
+            def do_GET(self):
+                path = self._path()
+                match = re.fullmatch(r"/batches/([^/]+)", path)
+                if match and match.group(1) in server.batches:
+                    batch = server.batches[match.group(1)]
+                    with server._lock:
+                        if batch["status"] != "completed":
+                            server._run_batch(batch)
+                    return self._send(200, batch)
+
+                match = re.fullmatch(r"/files/([^/]+)(/content)?", path)
+                if match and match.group(1) in server.files:
+                    file_obj = server.files[match.group(1)]
+                    if match.group(2):
+                        return self._send(200, raw=file_obj["content"])
+                    return self._send(200, server._public_file(file_obj))
+
+                self._send(404, {"error": {"message": f"unknown path {path}"}})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    with LocalBatchServer(port=8765) as local_server:
+        print(f"Local batch server listening on {local_server.base_url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,130 @@
+import math
+import re
+from collections import Counter
+
+STOPWORDS = {
+    "the", "a", "an", "to", "of", "or", "and", "for", "on", "off", "in", "at", "by", "is",
+    "my", "me", "please", "can", "you", "e", "g", "it", "this", "that", "with", "control",
+}
+
+
+def _tokens(text):
+    """Lowercase word tokens with a light plural strip, so 'subtitles' matches 'subtitle'."""
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+
+
+def _query_terms(text):
+    """Query tokens plus joined neighbours, so 'washing machine' also matches 'washingmachine'."""
+    words = _tokens(text)
+    return [w for w in words if w not in STOPWORDS] + [a + b for a, b in zip(words, words[1:])]
+
+
+class PluginRouter:
+    """
+    Keyword index over plugin and function descriptions, built once from a kernel. Each
+    query is scored against every plugin with IDF-weighted term overlap, and the top-K
+    plugins become the only ones whose functions are exposed for that call.
+    """
+
+    def __init__(self, kernel, top_k=2, name_boost=3.0):
+        self.top_k = top_k
+        self.name_boost = name_boost
+        documents = {}
+        self.function_counts = Counter()
+        for metadata in kernel.get_full_list_of_function_metadata():
+            parts = [metadata.name.replace("_", " "), metadata.description]
+            parts += [f"{p.name.replace('_', ' ')} {p.description or ''}" for p in metadata.parameters]
+            documents.setdefault(metadata.plugin_name, []).extend(parts)
+            self.function_counts[metadata.plugin_name] += 1
+        for plugin_name, plugin in kernel.plugins.items():
+            documents.setdefault(plugin_name, []).append(plugin.description or "")
+
+        self.plugins = list(documents)
+        self.name_terms = {
+            plugin: set(_tokens(plugin.replace("_", " "))) - STOPWORDS for plugin in self.plugins
+        }
+        self.terms = {
+            plugin: set(_tokens(" ".join(parts))) - STOPWORDS | self.name_terms[plugin]
+            for plugin, parts in documents.items()
+        }
+        document_frequency = Counter(term for terms in self.terms.values() for term in terms)
+        self.idf = {
+            term: math.log((1 + len(self.plugins)) / (1 + df)) + 1 for term, df in document_frequency.items()
+        }
+
+    def scores(self, text):
+        """Relevance of every plugin to a piece of query text."""
+        terms = _query_terms(text)
+        return {
+            plugin: sum(
+                self.idf[term] * (self.name_boost if term in self.name_terms[plugin] else 1)
+                for term in terms if term in self.terms[plugin]
+            )
+            for plugin in self.plugins
+        }
+
+    def route(self, query):
+        """
+        Candidate plugins for a query: the best plugin of each ' and '/','-separated intent,
+        topped up to top_k from the whole-query ranking. Falls back to all plugins when
+        nothing matches, so an unusual query is never left without tools.
+        """
+        overall = self.scores(query)
+        if not any(overall.values()):
+            return list(self.plugins)
+
+        candidates = []
+        for part in re.split(r"\s+and\s+|,|;", query, flags=re.IGNORECASE):
+            part_scores = self.scores(part)
+            best = max(part_scores, key=part_scores.get)
+            if part_scores[best] > 0 and best not in candidates:
+                candidates.append(best)
+
+        for plugin in sorted(overall, key=overall.get, reverse=True):
+            if len(candidates) >= max(self.top_k, 1):
+                break
+            if overall[plugin] > 0 and plugin not in candidates:
+                candidates.append(plugin)
+        return candidates
+
+    def exposed_functions(self, candidates):
+        """Number of function schemas sent with a call restricted to `candidates`."""
+        return sum(self.function_counts[plugin] for plugin in candidates)
+
+
+def routing_recall(candidates, expected_function):
+    """Share of the expected plugins that the router kept; None when nothing is expected."""
+    expected = {func.get("plugin_name") for func in expected_function or [] if func.get("plugin_name")}
+    if not expected:
+        return None
+    return round(len(expected & set(candidates)) / len(expected), 4)
+
+
+def routing_record(router, candidates, expected_function):
+    """The `routing` field written to agent_predicted.json for one query."""
+    return {
+        "candidate_plugins": candidates,
+        "exposed_functions": router.exposed_functions(candidates),
+        "recall": routing_recall(candidates, expected_function),
+    }
+
+
+def build_router(kernel, routing_config):
+    """Create a router from data_generation.routing, or None when routing is disabled."""
+    if not routing_config or not routing_config.get("enabled", False):
+        return None
+    return PluginRouter(kernel, top_k=routing_config.get("top_k", 2), name_boost=routing_config.get("name_boost", 3.0))
+
+
+def summarize_routing(results):
+    """Mean routing recall and exposed function count over generated records that were routed."""
+    routed = [r["routing"] for r in results if r.get("routing")]
+    if not routed:
+        return None
+    recalls = [r["recall"] for r in routed if r["recall"] is not None]
+    return {
+        "routed_queries": len(routed),
+        "mean_recall": round(sum(recalls) / len(recalls), 4) if recalls else None,
+        "mean_exposed_functions": round(sum(r["exposed_functions"] for r in routed) / len(routed), 2),
+    }
@@ -0,0 +1,70 @@
+import contextvars
+import time
+
+# Recorder of the query being answered; parallel tool calls run in child tasks that inherit it
+_current_recorder = contextvars.ContextVar("trajectory_recorder", default=None)
+
+
+def trajectory_call(plugin_name, function_name, arguments, result, duration_ms):
+    """One tool call in the compact trajectory format written to agent_predicted.json."""
+    return {
+        "plugin_name": plugin_name,
+        "function_name": function_name,
+        "arguments": arguments,
+        "result": result,
+        "duration_ms": duration_ms,
+    }
+
+
+class TrajectoryRecorder:
+    """
+    Append-only log of the tool calls made while answering one query. Calls are appended as
+    they finish, in any order when a round runs in parallel, and are grouped into rounds in
+    request order only when the trajectory is read. Use as a context manager around the
+    agent call so the auto function invocation filter can find it.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_recorder.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_recorder.reset(self._token)
+
+    def append(self, round_index, call_index, call):
+        self.entries.append((round_index, call_index, call))
+
+    def rounds(self):
+        """The trajectory: one {"round", "calls"} entry per tool-call round, in request order."""
+        rounds = {}
+        for position, (round_index, call_index, call) in enumerate(self.entries):
+            rounds.setdefault(round_index, []).append((position if call_index is None else call_index, call))
+        return [
+            {"round": round_index, "calls": [call for _, call in sorted(calls, key=lambda c: c[0])]}
+            for round_index, calls in sorted(rounds.items())
+        ]
+
+
+async def record_function_invocation(context, next):
+    """Auto function invocation filter that times each tool call into the active recorder."""
+    recorder = _current_recorder.get()
+    start = time.perf_counter()
+    await next(context)
+    if recorder is None:
+        return
+    value = context.function_result.value if context.function_result is not None else None
+    recorder.append(
+        context.request_sequence_index,
+        context.function_sequence_index,
+        trajectory_call(
+            context.function.plugin_name,
+            context.function.name,
+            dict(context.arguments or {}),
+            None if value is None else str(value),
+            round((time.perf_counter() - start) * 1000, 2),
+        ),
+    )
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    position INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    payload_hash TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_items_status ON items (status, lease_expires);
+"""
+
+
+class WorkQueue:
+    """
+    Durable SQLite work queue with leases. A claimed item is invisible to other workers
+    until its lease expires; expired leases are handed out again until `max_attempts`.
+    Several processes (or hosts sharing a filesystem with working locks) can open the
+    same file; use journal_mode DELETE instead of WAL on network filesystems.
+    """
+
+    def __init__(self, db_path, max_attempts=3, journal_mode="WAL"):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.conn.executescript(SCHEMA)
+        # Queue files created before payload hashing get the column; their items count as changed
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}
+        if "payload_hash" not in columns:
+            self.conn.execute("ALTER TABLE items ADD COLUMN payload_hash TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _transaction(self, fn):
+        """Run fn(cursor) inside BEGIN IMMEDIATE so claims from concurrent workers never overlap."""
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(cur)
+                cur.execute("COMMIT")
+                return result
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, items):
+        """
+        Add items in order, keyed by position and a hash of their payload, so re-enqueueing
+        resumes a run. Unchanged items keep their state and results. Items whose payload
+        changed, and items that failed, are reset to pending. Positions past the end of
+        `items` are removed. Returns {"added", "changed", "retried", "removed"} counts.
+        """
+        now = time.time()
+        entries = []
+        for position, item in enumerate(items):
+            payload = json.dumps(item)
+            payload_hash = hashlib.sha256(json.dumps(item, sort_keys=True).encode("utf-8")).hexdigest()
+            entries.append((position, payload, payload_hash))
+
+        def _enqueue(cur):
+            existing = dict(cur.execute("SELECT position, payload_hash FROM items").fetchall())
+            added = [(position, payload, payload_hash, now) for position, payload, payload_hash in entries
+                     if position not in existing]
+            changed = [(payload, payload_hash, now, position) for position, payload, payload_hash in entries
+                       if position in existing and existing[position] != payload_hash]
+            cur.executemany(
+                "INSERT INTO items (position, payload, payload_hash, updated_at) VALUES (?, ?, ?, ?)", added
+            )
+            cur.executemany(
+                "UPDATE items SET payload = ?, payload_hash = ?, status = 'pending', attempts = 0, result = NULL, "
+                "error = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE position = ?",
+                changed,
+            )
+            retried = cur.execute(
+                "UPDATE items SET status = 'pending', attempts = 0, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE status = 'failed' OR (status = 'leased' AND attempts >= ? AND lease_expires < ?)",
+                (now, self.max_attempts, now),
+            ).rowcount
+            removed = cur.execute("DELETE FROM items WHERE position >= ?", (len(entries),)).rowcount
+            return {"added": len(added), "changed": len(changed), "retried": retried, "removed": removed}
+
+        return self._transaction(_enqueue)
+
+    def claim(self, worker_id, lease_seconds, limit=1):
+        """Lease up to `limit` pending or lease-expired items. Returns [(position, item)]."""
+        def _claim(cur):
+            now = time.time()
+            rows = cur.execute(
+                "SELECT position, payload FROM items "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) AND attempts < ? "
+                "ORDER BY position LIMIT ?",
+                (now, self.max_attempts, limit),
+            ).fetchall()
+            cur.executemany(
+                "UPDATE items SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE position = ?",
+                [(worker_id, now + lease_seconds, now, position) for position, _ in rows],
+            )
+            return [(position, json.loads(payload)) for position, payload in rows]
+
+        return self._transaction(_claim)
+
+    def extend_leases(self, worker_id, positions, lease_seconds):
+        """Heartbeat: push out the lease of items this worker still holds."""
+        if not positions:
+            return
+        now = time.time()
+        self._transaction(lambda cur: cur.executemany(
+            "UPDATE items SET lease_expires = ?, updated_at = ? "
+            "WHERE position = ? AND status = 'leased' AND lease_owner = ?",
+            [(now + lease_seconds, now, position, worker_id) for position in positions],
+        ))
+
+    def complete(self, position, result):
+        """Store an item's result. A result from a worker whose lease expired is still accepted."""
+        self._transaction(lambda cur: cur.execute(
+            "UPDATE items SET status = 'done', result = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE position = ? AND status != 'done'",
+            (json.dumps(result), time.time(), position),
+        ))
+
+    def fail(self, position, error):
+        """Release an item after an error; it is retried until attempts reach max_attempts."""
+        self._transaction(lambda cur: cur.execute(
+            "UPDATE items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE position = ? AND status != 'done'",
+            (self.max_attempts, str(error), time.time(), position),
+        ))
+
+    def completed_results(self, exclude=()):
+        """Results of done items whose position is not in `exclude`, as [(position, result)] in position order."""
+        with self._lock:
+            positions = [row[0] for row in self.conn.execute(
+                "SELECT position FROM items WHERE status = 'done' ORDER BY position"
+            )]
+            new_positions = [position for position in positions if position not in exclude]
+            rows = []
+            # Fetch only the new results, in chunks below SQLite's variable limit
+            for start in range(0, len(new_positions), 500):
+                chunk = new_positions[start:start + 500]
+                rows.extend(self.conn.execute(
+                    f"SELECT position, result FROM items WHERE position IN ({','.join('?' * len(chunk))}) "
+                    "ORDER BY position",
+                    chunk,
+                ).fetchall())
+        return [(position, json.loads(result)) for position, result in rows]
+
+    def counts(self):
+        """Number of items per status. Leased items out of attempts count as failed."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND attempts >= ? AND lease_expires < ? THEN 'failed' "
+                "ELSE status END, COUNT(*) FROM items GROUP BY 1",
+                (self.max_attempts, time.time()),
+            ).fetchall()
+        return dict(rows)
+
+    def is_drained(self):
+        """True when no item can still be claimed or is being worked on."""
+        counts = self.counts()
+        return counts.get("pending", 0) == 0 and counts.get("leased", 0) == 0
+
+    def items(self):
+        """All items in enqueue order as (position, item, status, result, error)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT position, payload, status, result, error FROM items ORDER BY position"
+            ).fetchall()
+        return [
+            (position, json.loads(payload), status, json.loads(result) if result else None, error)
+            for position, payload, status, result, error in rows
+        ]
@@ -4,7 +4,7 @@ import sys
 from pathlib import Path
 from typing import Any
 
-from utils.logger import logger
+from utils.logger import logger, setup_logging
 from utils.load_config import load_config
 from utils.load_mapping_schema import load_mapping_schema
 
@@ -25,9 +25,24 @@ def get_nested_value(d: dict, key_path: str) -> Any:
     return d or None
 
 
+def trajectory_rounds(trajectory, target_fields):
+    """
+    Reduce a generated trajectory to its rounds of calls in the expected_function shape
+    (timings dropped), so the evaluator can compare it round by round. None without one.
+    Fields are read like the mapped predicted_function, so empty values become None in both.
+    """
+    if not trajectory:
+        return None
+    return [
+        [{field: get_nested_value(call, field) for field in target_fields} for call in entry.get("calls", [])]
+        for entry in trajectory
+    ]
+
+
 def replace_predicted_with_mapped(agent_data, mapping_schema):
     """
-    Transforms the 'predicted_function' field of each agent output using a mapping schema.
+    Transforms the 'predicted_function' field of each agent output using a mapping schema,
+    and adds the tool-call rounds of its trajectory as 'predicted_trajectory'.
     """
     source_key = mapping_schema["source_key"]
     field_mappings = mapping_schema["mappings"]
@@ -46,11 +61,32 @@ def replace_predicted_with_mapped(agent_data, mapping_schema):
             mapped_functions.append(mapped_func)
 
         new_item[source_key] = mapped_functions
+        new_item["predicted_trajectory"] = trajectory_rounds(item.get("trajectory"), list(field_mappings.values()))
         output.append(new_item)
 
     return output
 
 
+def load_agent_output(input_file):
+    """Read the agent_predicted.json records written by data generation."""
+    with open(input_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_transformed_outputs(mapped_output, output_file_json, output_file_jsonl):
+    """Write transformed records as indented JSON and as JSONL for the evaluator."""
+    os.makedirs(os.path.dirname(output_file_json), exist_ok=True)
+
+    with open(output_file_json, "w", encoding="utf-8") as f:
+        json.dump(mapped_output, f, indent=2)
+    logger.info(f"Transformed data written to {output_file_json}")
+
+    with open(output_file_jsonl, "w", encoding="utf-8") as f:
+        for item in mapped_output:
+            f.write(json.dumps(item) + "\n")
+    logger.info(f"Transformed data (JSONL) written to {output_file_jsonl}")
+
+
 def main():
     try:
         config = load_config()
@@ -70,8 +106,7 @@ def main():
         return
 
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            input_data = json.load(f)
+        input_data = load_agent_output(input_file)
         logger.info(f"Loaded input data from {input_file}")
     except Exception as e:
         logger.exception(f"Failed to read input file: {input_file}")
@@ -86,20 +121,11 @@ def main():
         return
 
     try:
-        os.makedirs(os.path.dirname(output_file_json), exist_ok=True)
-
-        with open(output_file_json, "w", encoding="utf-8") as f:
-            json.dump(mapped_output, f, indent=2)
-        logger.info(f"Transformed data written to {output_file_json}")
-
-        with open(output_file_jsonl, "w", encoding="utf-8") as f:
-            for item in mapped_output:
-                f.write(json.dumps(item) + "\n")
-        logger.info(f"Transformed data (JSONL) written to {output_file_jsonl}")
-
+        write_transformed_outputs(mapped_output, output_file_json, output_file_jsonl)
     except Exception as e:
         logger.exception("Failed to write output files.")
 
 
 if __name__ == "__main__":
+    setup_logging()
     main()
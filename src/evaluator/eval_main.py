@@ -3,8 +3,10 @@ import sys
 from pathlib import Path
 
 from run_eval import custom_eval
+from local_eval import local_eval
+from utils.columnar_results import write_parquet_results
 from utils.load_config import load_config
-from utils.logger import logger 
+from utils.logger import logger, setup_logging
 
 # Ensure project root is in the import path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -24,7 +26,10 @@ def main():
         input_file = os.path.join(dataset_path, eval_config["input_path"], eval_config["input_file"])
         output_file = os.path.join(dataset_path, eval_config["output_path"], eval_config["output_file"])
         eval_name = eval_config["eval_name"]
-        logger.info(f"Running evaluation '{eval_name}'")
+        backend = eval_config.get("backend", "azure")
+        output_format = eval_config.get("output_format", "json")
+        parquet_dir = os.path.join(dataset_path, eval_config["output_path"], eval_config.get("parquet_dir", "evaluation_results_parquet"))
+        logger.info(f"Running evaluation '{eval_name}' with {backend} backend")
     except KeyError as e:
         logger.exception(f"Missing evaluation config key: {e}")
         return
@@ -33,11 +38,29 @@ def main():
         return
 
     try:
-        result = custom_eval(eval_name, input_file, output_file)
+        if backend == "local":
+            result = local_eval(input_file, output_file)
+        else:
+            result = custom_eval(eval_name, input_file, output_file)
         logger.info(f"Evaluation completed. Output saved to {output_file}")
     except Exception as e:
         logger.exception("Evaluation step failed.")
+        return
+
+    if output_format == "parquet":
+        try:
+            write_parquet_results(
+                result.get("rows", []),
+                result.get("metrics", {}),
+                parquet_dir,
+                row_group_size=eval_config.get("parquet_row_group_size", 100_000),
+                extra={"eval_name": eval_name, "studio_url": result.get("studio_url")},
+            )
+            logger.info(f"Parquet evaluation results written to {parquet_dir}")
+        except Exception as e:
+            logger.exception("Failed to write Parquet evaluation results.")
 
 
 if __name__ == "__main__":
+    setup_logging()
     main()
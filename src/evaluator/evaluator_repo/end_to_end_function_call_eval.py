@@ -1,10 +1,25 @@
-from evaluator_repo.eval_utils.function_call_utils import compare_field, compare_full_match, compare_field_itemwise
+from evaluator_repo.eval_utils.function_call_utils import compare_field, compare_full_match, compare_field_itemwise, compare_trajectory
+from utils.function_call_record import as_function_calls, shared_scope
 
 class EndToEndFunctionCallEvaluator:
     def __init__(self):
         pass
 
-    def __call__(self, expected, predicted, **kwargs): 
+    def __call__(self, expected, predicted, trajectory=None, **kwargs): 
+        rounds = [calls or [] for calls in trajectory] if isinstance(trajectory, list) else None
+        # Records loaded together share an intern scope, and their fields compare as integers.
+        # Plain dicts (service, dashboard) are compared as they are, without interning.
+        scope = shared_scope(expected, predicted, *(rounds or []))
+        if scope is not None:
+            expected = as_function_calls(expected, scope)
+            predicted = as_function_calls(predicted, scope)
+            if rounds is not None:
+                rounds = [as_function_calls(calls, scope) for calls in rounds]
+        expected = expected or []
+        predicted = predicted or []
+        # Without a recorded trajectory each predicted call counts as its own round
+        if rounds is None:
+            rounds = [[func] for func in predicted]
         return {
                 "Plugin_name_accuracy": compare_field(expected, predicted, "plugin_name"), 
                 "Function_name_accuracy": compare_field(expected, predicted, "function_name"),
@@ -12,4 +27,5 @@ class EndToEndFunctionCallEvaluator:
                 "Itemwise_arguments_accuracy": compare_field_itemwise(expected, predicted, "arguments"),
                 "Itemwise_plugin_accuracy": compare_field_itemwise(expected, predicted, "plugin_name"),
                 "Overall_accuracy": compare_full_match(expected, predicted),
+                "Trajectory_accuracy": compare_trajectory(expected, rounds),
                 } 
\ No newline at end of file
@@ -1,3 +1,13 @@
+from collections import Counter
+
+from utils.function_call_record import FunctionCall, call_key
+
+
+def _field_key(func, field):
+    """Interned integer key for FunctionCall records, the raw value for plain dicts."""
+    return func.field_id(field) if type(func) is FunctionCall else func.get(field)
+
+
 def compare_full_match(expected, predicted):
     """Returns True if expected and predicted functions fully match (order-sensitive)."""
     return expected == predicted
@@ -7,8 +17,8 @@ def compare_field(expected, predicted, field):
     Compare specific field (e.g., 'plugin_name' or 'arguments') between two function lists.
     Returns True if all items match field-wise (order-sensitive).
     """
-    expected_fields = [func.get(field) for func in expected]
-    predicted_fields = [func.get(field) for func in predicted]
+    expected_fields = [_field_key(func, field) for func in expected]
+    predicted_fields = [_field_key(func, field) for func in predicted]
     return expected_fields == predicted_fields
 
 def compare_field_itemwise(expected, predicted, field):
@@ -28,6 +38,20 @@ def compare_field_itemwise(expected, predicted, field):
 
     # Case 3: field-by-field comparison
     for e, p in zip(expected, predicted):
-        result.append(1 if e.get(field) == p.get(field) else 0)
+        result.append(1 if _field_key(e, field) == _field_key(p, field) else 0)
+
+    return result
 
-    return result
\ No newline at end of file
+def compare_trajectory(expected, rounds):
+    """
+    Returns True if the predicted tool-call rounds cover the expected functions in order.
+    Calls within one round ran in parallel, so their order inside the round is ignored;
+    each round must match the next expected functions as a multiset.
+    """
+    position = 0
+    for calls in rounds:
+        expected_calls = expected[position:position + len(calls)]
+        if Counter(map(call_key, expected_calls)) != Counter(map(call_key, calls)):
+            return False
+        position += len(calls)
+    return position == len(expected)
@@ -0,0 +1,76 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+PRIME = np.uint64(1000003)
+
+
+def _normalize(text):
+    return " " + " ".join(str(text or "").lower().split()) + " "
+
+
+def _mix(h):
+    """Finalizer from MurmurHash3 so the low bits used for bucketing are well spread."""
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    return h
+
+
+class ResponseSimilarityEvaluator:
+    """
+    Cosine similarity between predicted and expected responses using hashed character
+    n-gram term frequencies. Runs locally in NumPy; vectors are cached by text hash since
+    expected responses repeat across queries.
+    """
+
+    def __init__(self, ngram_range=(2, 4), n_features=2048, chunk_size=1024, cache_size=100_000):
+        self.ngram_range = ngram_range
+        self.n_features = n_features
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def _vectorize(self, text):
+        data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        with np.errstate(over="ignore"):
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                count = len(data) - n + 1
+                if count <= 0:
+                    continue
+                h = np.full(count, n, dtype=np.uint64)
+                for offset in range(n):
+                    h = h * PRIME + data[offset:offset + count]
+                buckets = (_mix(h) % np.uint64(self.n_features)).astype(np.intp)
+                vector += np.bincount(buckets, minlength=self.n_features)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def vector(self, text):
+        """L2-normalized n-gram vector of a text, from the cache when seen before."""
+        normalized = _normalize(text)
+        key = hashlib.sha1(normalized.encode("utf-8")).digest()
+        vector = self._cache.get(key)
+        if vector is None:
+            vector = self._vectorize(normalized)
+            self._cache[key] = vector
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return vector
+
+    def score_batch(self, responses, expected_responses):
+        """Similarity for each (response, expected_response) pair, one matrix product per chunk."""
+        scores = np.empty(len(responses), dtype=np.float32)
+        for start in range(0, len(responses), self.chunk_size):
+            end = start + self.chunk_size
+            predicted = np.stack([self.vector(text) for text in responses[start:end]])
+            expected = np.stack([self.vector(text) for text in expected_responses[start:end]])
+            scores[start:end] = np.einsum("ij,ij->i", predicted, expected)
+        return [round(float(score), 4) for score in scores]
+
+    def __call__(self, *, response=None, expected_response=None, **kwargs):
+        return {"Response_similarity": self.score_batch([response], [expected_response])[0]}
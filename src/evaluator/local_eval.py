@@ -0,0 +1,81 @@
+import json
+import os
+
+from evaluator_repo.end_to_end_function_call_eval import EndToEndFunctionCallEvaluator
+from evaluator_repo.response_similarity_eval import ResponseSimilarityEvaluator
+from utils.function_call_record import InternScope, encode_function_call
+from utils.logger import logger
+
+EVALUATOR_NAME = "end_to_end_function_call"
+SIMILARITY_EVALUATOR_NAME = "response_similarity"
+SIMILARITY_COLUMN = f"outputs.{SIMILARITY_EVALUATOR_NAME}.Response_similarity"
+
+
+def score_row(evaluator, item):
+    """Score one transformed record with the end-to-end function call evaluator."""
+    return evaluator(
+        expected=item.get("expected_function", []),
+        predicted=item.get("predicted_function", []),
+        trajectory=item.get("predicted_trajectory"),
+        response=item.get("predicted_response"),
+    )
+
+
+def score_similarity(similarity_evaluator, items):
+    """Response similarity for a list of transformed records, scored as one batch."""
+    return similarity_evaluator.score_batch(
+        [item.get("predicted_response") for item in items],
+        [item.get("expected_response") for item in items],
+    )
+
+
+def to_result_row(item, outputs, line_number, evaluator_name=EVALUATOR_NAME):
+    """Build a result row in the same shape evaluate() writes to evaluation_results.json."""
+    row = {f"inputs.{key}": value for key, value in item.items()}
+    row.update({f"outputs.{evaluator_name}.{key}": value for key, value in outputs.items()})
+    row["line_number"] = line_number
+    return row
+
+
+def aggregate_metrics(rows):
+    """Mean of every boolean or numeric output column, keyed like evaluate() metrics."""
+    totals = {}
+    for row in rows:
+        for key, value in row.items():
+            if key.startswith("outputs.") and isinstance(value, (bool, int, float)):
+                totals[key[len("outputs."):]] = totals.get(key[len("outputs."):], 0) + value
+    return {key: total / len(rows) for key, total in totals.items()} if rows else {}
+
+
+def score_rows(data):
+    """Score transformed records locally. Returns (rows, metrics) like evaluate()."""
+    evaluator = EndToEndFunctionCallEvaluator()
+    rows = [to_result_row(item, score_row(evaluator, item), i) for i, item in enumerate(data)]
+    for row, similarity in zip(rows, score_similarity(ResponseSimilarityEvaluator(), data)):
+        row[SIMILARITY_COLUMN] = similarity
+    return rows, aggregate_metrics(rows)
+
+
+def load_jsonl(path):
+    """
+    Read a JSONL file into a list of records, with function call lists as FunctionCall records
+    interned in one scope for this load.
+    """
+    decoder = InternScope().json_decoder()
+    with open(path, "r", encoding="utf-8") as f:
+        return [decoder.decode(line) for line in f if line.strip()]
+
+
+def local_eval(data_path, output_path):
+    """
+    Score a transformed JSONL file without Azure AI Foundry and write the result
+    in the evaluation_results.json shape.
+    """
+    data = load_jsonl(data_path)
+    rows, metrics = score_rows(data)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "metrics": metrics}, f, default=encode_function_call)
+    logger.info(f"Local evaluation of {len(rows)} rows written to {output_path}")
+    return {"rows": rows, "metrics": metrics}
@@ -1,9 +1,10 @@
 import os
 from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
 from azure.ai.projects import AIProjectClient
 from azure.ai.evaluation import evaluate
 from evaluator_repo.end_to_end_function_call_eval import EndToEndFunctionCallEvaluator
+from evaluator_repo.response_similarity_eval import ResponseSimilarityEvaluator
+from utils.http_transport import get_azure_core_transport, get_credential
 from utils.logger import logger  # ✅ Add logger
 
 # Load environment variables
@@ -14,7 +15,7 @@ def custom_eval(name, data_path, output_path):
     Evaluate the model using the given data and column mapping.
     """
     try:
-        credential = DefaultAzureCredential()
+        credential = get_credential()
         logger.info("Azure credential initialized.")
     except Exception as e:
         logger.exception("Failed to initialize Azure credentials.")
@@ -25,6 +26,7 @@ def custom_eval(name, data_path, output_path):
         project = AIProjectClient.from_connection_string(
             conn_str=connection_string,
             credential=credential,
+            transport=get_azure_core_transport(),
         )
         logger.info("Connected to Azure AI Project successfully.")
     except KeyError:
@@ -48,13 +50,15 @@ def custom_eval(name, data_path, output_path):
 
     try:
         end_to_end_function_call_eval = EndToEndFunctionCallEvaluator()
-        logger.info("End-to-end function call evaluator initialized.")
+        response_similarity_eval = ResponseSimilarityEvaluator()
+        logger.info("End-to-end function call and response similarity evaluators initialized.")
 
         result = evaluate(
             data=data_path,
             evaluation_name=name,
             evaluators={
-                "end_to_end_function_call": end_to_end_function_call_eval
+                "end_to_end_function_call": end_to_end_function_call_eval,
+                "response_similarity": response_similarity_eval
             },
             evaluator_config={
                 "end_to_end_function_call": {
@@ -62,8 +66,15 @@ def custom_eval(name, data_path, output_path):
                         "query": "${data.query}",
                         "expected": "${data.expected_function}",
                         "predicted": "${data.predicted_function}",
+                        "trajectory": "${data.predicted_trajectory}",
                         "response": "${data.predicted_response}"
                     }
+                },
+                "response_similarity": {
+                    "column_mapping": {
+                        "response": "${data.predicted_response}",
+                        "expected_response": "${data.expected_response}"
+                    }
                 }
             },
             azure_ai_project=project.scope,
@@ -1,9 +1,11 @@
 import os
 import sys
+import argparse
 import asyncio
 import yaml
 from utils.load_config import load_config
-from utils.logger import logger
+from utils.logger import logger, setup_logging
+from utils.profiling import profile_stage
 
 # Add the paths to the system path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'datagenerator'))
@@ -11,12 +13,23 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'datatransformer'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'evaluator'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'report'))
 
-from datagenerator import device_control_agent
+from datagenerator import device_control_agent, batch_generation, distributed_generation
 from datatransformer import data_transform
 from evaluator import eval_main
-from reportgenerator import generate_report
+from reportgenerator import generate_report, run_history, compare_report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the agentic evaluation pipeline.")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"],
+                        help="Profile each pipeline step (overrides the profiling section of config.yaml).")
+    parser.add_argument("--profile-stages", nargs="+",
+                        help="Only profile these steps, e.g. data_transformation evaluation.")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
+    setup_logging()
+    args = parse_args()
     try:
         config = load_config()
         pipeline_config = config['pipeline']['steps']
@@ -25,18 +38,35 @@ if __name__ == "__main__":
         logger.exception("Failed to load configuration.")
         sys.exit(1)
 
+    profiling_config = dict(config.get('profiling') or {})
+    if args.profile:
+        profiling_config.update(enabled=True, profiler=args.profile)
+    if args.profile_stages:
+        profiling_config['stages'] = args.profile_stages
+    profiling_config['output_path'] = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), profiling_config.get('output_path', 'profiles')
+    )
+
     if 'data_generation' in pipeline_config:
         try:
-            logger.info("Executing device_control_agent")
-            asyncio.run(device_control_agent.main())
-            logger.info("device_control_agent executed")
+            generation_mode = config['data_generation'].get('mode', 'interactive')
+            logger.info(f"Executing data generation ({generation_mode} mode)")
+            with profile_stage('data_generation', profiling_config):
+                if generation_mode == 'batch':
+                    asyncio.run(batch_generation.main())
+                elif generation_mode == 'distributed':
+                    distributed_generation.main()
+                else:
+                    asyncio.run(device_control_agent.main())
+            logger.info("data generation executed")
         except Exception as e:
-            logger.exception("device_control_agent step failed")
+            logger.exception("data generation step failed")
 
     if 'data_transformation' in pipeline_config:
         try:
             logger.info("Executing data_transform")
-            data_transform.main()
+            with profile_stage('data_transformation', profiling_config):
+                data_transform.main()
             logger.info("data_transform executed")
         except Exception as e:
             logger.exception("data_transform step failed")
@@ -44,7 +74,8 @@ if __name__ == "__main__":
     if 'evaluation' in pipeline_config:
         try:
             logger.info("Executing eval_main")
-            eval_main.main()
+            with profile_stage('evaluation', profiling_config):
+                eval_main.main()
             logger.info("eval_main executed")
         except Exception as e:
             logger.exception("eval_main step failed")
@@ -52,9 +83,28 @@ if __name__ == "__main__":
     if 'reporting' in pipeline_config:
         try:
             logger.info("Executing report generation")
-            generate_report.main()
+            with profile_stage('reporting', profiling_config):
+                generate_report.main()
             logger.info("report generation executed")
         except Exception as e:
             logger.exception("report generation step failed")
 
+    if 'run_history' in pipeline_config:
+        try:
+            logger.info("Executing run history ingestion")
+            with profile_stage('run_history', profiling_config):
+                run_history.main()
+            logger.info("run history ingestion executed")
+        except Exception as e:
+            logger.exception("run history ingestion step failed")
+
+    if 'comparison_report' in pipeline_config:
+        try:
+            logger.info("Executing comparison report generation")
+            with profile_stage('comparison_report', profiling_config):
+                compare_report.main()
+            logger.info("comparison report generation executed")
+        except Exception as e:
+            logger.exception("comparison report generation step failed")
+
     logger.info("Pipeline executed (some steps may have failed).")
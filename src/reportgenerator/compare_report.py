@@ -0,0 +1,119 @@
+import os
+import sys
+from pathlib import Path
+
+import plotly.graph_objects as go
+from jinja2 import Environment, FileSystemLoader
+from utils.load_config import load_config
+from utils.logger import logger, setup_logging
+
+from reportgenerator.run_history import RunHistoryStore, get_history_db_path
+
+# Ensure import path for project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def run_label(run):
+    """Short display label for a run."""
+    label = run.get("label") or run["run_id"]
+    return f"{label} ({run['created_at'][:16]})"
+
+
+def build_plugin_deltas(plugin_accuracy, runs):
+    """
+    Build per-plugin accuracy rows across runs, with the delta between the
+    first and the latest run that contain the plugin.
+    """
+    plugin_rows = []
+    for plugin, by_run in plugin_accuracy.items():
+        values = [by_run.get(run["run_id"]) for run in runs]
+        present = [v["accuracy"] for v in values if v is not None]
+        plugin_rows.append({
+            "plugin": plugin,
+            "values": values,
+            "delta": present[-1] - present[0] if len(present) > 1 else 0.0,
+        })
+    plugin_rows.sort(key=lambda x: x["delta"])
+    return plugin_rows
+
+
+def create_plugin_trend_chart(plugin_rows, runs):
+    """Create line chart of per-plugin overall accuracy across runs."""
+    labels = [run_label(run) for run in runs]
+    fig = go.Figure()
+    for row in plugin_rows:
+        fig.add_trace(go.Scatter(
+            x=labels,
+            y=[v["accuracy"] if v else None for v in row["values"]],
+            mode='lines+markers',
+            name=row["plugin"],
+            hovertemplate="<b>%{x}</b><br>Accuracy: %{y:.1f}%<extra></extra>"
+        ))
+
+    fig.update_layout(
+        xaxis_title='Run',
+        yaxis=dict(title='Overall Accuracy (%)', range=[0, 100]),
+        legend_title='Plugin Name'
+    )
+    return fig.to_html(full_html=False)
+
+
+def generate_comparison_report(store, num_runs, template_path, output_path):
+    """Generate HTML comparison report for the latest `num_runs` runs."""
+    runs = store.latest_runs(num_runs)
+    if not runs:
+        raise ValueError("No runs found in run history.")
+
+    run_ids = [run["run_id"] for run in runs]
+    plugin_rows = build_plugin_deltas(store.plugin_accuracy(run_ids), runs)
+    flips = store.query_flips(run_ids)
+
+    template_dir = os.path.dirname(template_path)
+    template_name = os.path.basename(template_path)
+    env = Environment(loader=FileSystemLoader(template_dir))
+    template = env.get_template(template_name)
+
+    html_content = template.render(
+        runs=runs,
+        run_labels=[run_label(run) for run in runs],
+        plugin_rows=plugin_rows,
+        flips=flips,
+        plugin_trend_chart=create_plugin_trend_chart(plugin_rows, runs),
+    )
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+
+def main():
+    config = load_config()
+    history_config = config["run_history"]
+    report_config = config["report"]
+
+    dataset_path = Path(__file__).resolve().parents[1]
+    db_path = get_history_db_path(config)
+
+    try:
+        template_path = os.path.join(
+            os.path.dirname(__file__),
+            report_config["template_path"],
+            history_config["template_file"]
+        )
+
+        output_folder = os.path.join(dataset_path, report_config["output_path"])
+        os.makedirs(output_folder, exist_ok=True)
+        output_file = os.path.join(output_folder, history_config["output_file"])
+
+        with RunHistoryStore(db_path) as store:
+            generate_comparison_report(store, history_config["compare_runs"], template_path, output_file)
+        logger.info(f"✅ Comparison report generated at: {output_file}")
+
+    except ValueError as e:
+        logger.error(f"❌ {e}")
+    except Exception as e:
+        logger.exception(f"❌ Failed to generate comparison report: {e}")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -1,28 +1,52 @@
 import os
 import sys
-import json
 import warnings
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from jinja2 import Environment, FileSystemLoader
+from utils.columnar_results import load_parquet_results
+from utils.function_call_record import InternScope, compact_record
 from utils.load_config import load_config
-from utils.logger import logger
+from utils.logger import logger, setup_logging
 
 # Ensure import path for project root
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
+# Parquet columns the report reads; itemwise scores and predicted responses are skipped
+REPORT_COLUMNS = [
+    "query",
+    "expected_response",
+    "expected_function",
+    "predicted_function",
+    "performance",
+    "plugin_name_accuracy",
+    "function_name_accuracy",
+    "arguments_accuracy",
+    "overall_accuracy",
+    "response_similarity",
+]
+
+
 def load_data(json_file):
-    """Load rows and metrics from JSON file."""
+    """Load rows and metrics from JSON file, or from a Parquet results directory."""
+    # Function calls are held as records interned for this load; the template reads them like dicts
+    keys = ('inputs.expected_function', 'inputs.predicted_function', 'inputs.predicted_trajectory')
+    scope = InternScope()
+    if os.path.isdir(json_file):
+        rows, metrics = load_parquet_results(json_file, columns=REPORT_COLUMNS)
+        return [compact_record(row, scope, keys) for row in rows], metrics
+
     if not os.path.exists(json_file):
         raise FileNotFoundError(f"File not found: {json_file}. Ensure the path is correct.")
-    
-    with open(json_file, 'r') as f:
-        data = json.load(f)
 
+    # Rows are compacted while the file is parsed, not after the whole file is loaded
+    with open(json_file, 'r') as f:
+        data = scope.json_decoder(keys).decode(f.read())
     return data.get('rows', []), data.get('metrics', {})
 
 
@@ -194,46 +218,128 @@ def create_plugin_accuracy_by_function_chart(data):
     return charts
 
 
-def generate_report(rows, metrics, template_path, output_path):
-    """Generate HTML report using Jinja2 template."""
-    template_dir = os.path.dirname(template_path)
-    template_name = os.path.basename(template_path)
+def collect_latency_by_plugin(data, metric):
+    """Group a per-query performance metric by the plugins of its expected functions."""
+    latencies = {}
+    for row in data:
+        performance = row.get('inputs.performance') or {}
+        value = performance.get(metric)
+        if value is None:
+            continue
+        plugins = {func['plugin_name'] for func in row['inputs.expected_function']}
+        for plugin in plugins:
+            latencies.setdefault(plugin, []).append(value)
+    return latencies
+
+
+def create_latency_percentile_chart(data, metric, title):
+    """Create grouped bar chart of p50/p90/p99 for a performance metric by plugin name."""
+    latencies = collect_latency_by_plugin(data, metric)
+    if not latencies:
+        return None
+
+    plugins = sorted(latencies)
+    percentiles = {p: np.percentile(latencies[p], [50, 90, 99]) for p in plugins}
+
+    fig = go.Figure([
+        go.Bar(
+            name=label,
+            x=plugins,
+            y=[percentiles[p][i] for p in plugins],
+            text=[f"{percentiles[p][i]:.0f}" for p in plugins],
+            textposition='auto',
+            hovertemplate="<b>%{x}</b><br>" + label + ": %{y:.0f} ms<extra></extra>"
+        ) for i, label in enumerate(['p50', 'p90', 'p99'])
+    ])
+
+    fig.update_layout(
+        title=title,
+        barmode='group',
+        xaxis_title='Plugin Name',
+        yaxis_title='Milliseconds',
+        legend_title='Percentile',
+        bargap=0.3
+    )
+
+    return fig.to_html(full_html=False)
 
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template(template_name)
 
+def summarize_performance(data):
+    """Summarize latency percentiles and token usage across all queries."""
+    performance = [row.get('inputs.performance') or {} for row in data]
+    latencies = [p['total_latency_ms'] for p in performance if p.get('total_latency_ms') is not None]
+    if not latencies:
+        return None
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        'p50_latency_ms': round(float(p50), 1),
+        'p90_latency_ms': round(float(p90), 1),
+        'p99_latency_ms': round(float(p99), 1),
+        'avg_tool_call_rounds': round(float(np.mean([p.get('tool_call_rounds') or 0 for p in performance])), 2),
+        'prompt_tokens': sum(p.get('prompt_tokens') or 0 for p in performance),
+        'completion_tokens': sum(p.get('completion_tokens') or 0 for p in performance),
+    }
+
+
+def build_report_context(rows, metrics):
+    """Aggregate rows and metrics into the charts and summary values the template renders."""
     df = pd.DataFrame(rows)
 
     # Charts
     plugin_dist_chart = create_plugin_distribution_chart(df)
     accuracy_chart = create_accuracy_metrics_chart(metrics)
     plugin_overall_chart = create_plugin_overall_accuracy_chart(rows)
+    latency_chart = create_latency_percentile_chart(rows, 'total_latency_ms', 'Total Latency by Plugin')
+    ttft_chart = create_latency_percentile_chart(rows, 'time_to_first_token_ms', 'Time to First Token by Plugin')
+    performance_summary = summarize_performance(rows)
 
     total_queries = len(df)
     successful_queries = df['outputs.end_to_end_function_call.Overall_accuracy'].sum()
     success_rate = (successful_queries / total_queries) * 100
 
-    html_content = template.render(
+    return dict(
         rows=rows,
         metrics=metrics,
         agent_overall_accuracy_chart=plugin_overall_chart,
         accuracy_chart=accuracy_chart,
         function_dist_chart=plugin_dist_chart,
+        latency_chart=latency_chart,
+        ttft_chart=ttft_chart,
+        performance_summary=performance_summary,
         total_queries=total_queries,
         successful_queries=int(successful_queries),
         success_rate=round(success_rate, 1)
     )
 
+
+def render_report(context, template_path, output_path):
+    """Render a report context with the Jinja2 template and write the HTML file."""
+    template_dir = os.path.dirname(template_path)
+    template_name = os.path.basename(template_path)
+
+    env = Environment(loader=FileSystemLoader(template_dir))
+    template = env.get_template(template_name)
+
+    html_content = template.render(**context)
+
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(html_content)
 
 
+def generate_report(rows, metrics, template_path, output_path):
+    """Generate HTML report using Jinja2 template."""
+    render_report(build_report_context(rows, metrics), template_path, output_path)
+
+
 def main():
     config = load_config()
     report_config = config["report"]
 
     dataset_path = Path(__file__).resolve().parents[1]
     input_file = os.path.join(dataset_path, report_config["input_path"], report_config["input_file"])
+    if report_config.get("input_format", "json") == "parquet":
+        input_file = os.path.join(dataset_path, report_config["input_path"], report_config["input_parquet_dir"])
 
     try:
         rows, metrics = load_data(input_file)
@@ -259,4 +365,5 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging()
     main()
@@ -0,0 +1,338 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from utils.load_config import load_config
+from utils.logger import logger, setup_logging
+
+# Ensure import path for project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+OUTPUT_PREFIX = "outputs.end_to_end_function_call."
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    eval_name TEXT,
+    label TEXT,
+    source_file TEXT,
+    row_count INTEGER NOT NULL,
+    metrics_json TEXT
+);
+CREATE TABLE IF NOT EXISTS query_results (
+    run_id TEXT NOT NULL,
+    line_number INTEGER NOT NULL,
+    query_fingerprint TEXT NOT NULL,
+    query TEXT,
+    case_key TEXT,
+    expected TEXT,
+    plugin_name_accuracy INTEGER,
+    function_name_accuracy INTEGER,
+    arguments_accuracy INTEGER,
+    overall_accuracy INTEGER,
+    PRIMARY KEY (run_id, line_number)
+);
+CREATE TABLE IF NOT EXISTS function_results (
+    run_id TEXT NOT NULL,
+    line_number INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    plugin_name TEXT,
+    function_name TEXT,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (run_id, line_number, position)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at);
+CREATE INDEX IF NOT EXISTS idx_query_results_fingerprint ON query_results (query_fingerprint, run_id);
+CREATE INDEX IF NOT EXISTS idx_function_results_plugin ON function_results (plugin_name, function_name, run_id);
+CREATE INDEX IF NOT EXISTS idx_function_results_run ON function_results (run_id, plugin_name);
+"""
+
+# Created after the migration below, since older stores lack the column
+CASE_KEY_INDEX = "CREATE INDEX IF NOT EXISTS idx_query_results_case ON query_results (case_key, run_id)"
+
+
+def query_fingerprint(query):
+    """Stable fingerprint of a query, insensitive to case and whitespace."""
+    normalized = re.sub(r"\s+", " ", (query or "").strip().lower())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def expected_signature(functions):
+    """Expected plugin/function names of a row, e.g. 'tv_control-turn_on, tv_control-set_volume'."""
+    return ", ".join(f"{func.get('plugin_name')}-{func.get('function_name')}" for func in functions or [])
+
+
+def case_keys(fingerprints_and_signatures):
+    """
+    Key of each row's test case: query fingerprint plus expected functions, with an ordinal
+    for repeated cases, so the n-th repeat of a case is matched with its n-th repeat in other
+    runs instead of every repeat collapsing into one.
+    """
+    seen = {}
+    keys = []
+    for fingerprint, signature in fingerprints_and_signatures:
+        base = hashlib.sha1(f"{fingerprint}|{signature}".encode("utf-8")).hexdigest()[:16]
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        keys.append(f"{base}:{occurrence}")
+    return keys
+
+
+def _as_int(value):
+    """Convert a boolean-like evaluator output to 0/1 (None stays None)."""
+    if value is None:
+        return None
+    return int(bool(value))
+
+
+class RunHistoryStore:
+    """
+    SQLite store of evaluation runs. Rows and per-function outcomes are indexed by
+    run id, query fingerprint and plugin/function so comparisons across runs are
+    indexed lookups instead of re-parsing every evaluation_results.json.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+        self._migrate_case_keys()
+        self.conn.execute(CASE_KEY_INDEX)
+
+    def _migrate_case_keys(self):
+        """Add case keys to stores created before them, rebuilt from the stored expected functions."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(query_results)")}
+        if "case_key" in columns:
+            return
+        with self.conn:
+            self.conn.execute("ALTER TABLE query_results ADD COLUMN case_key TEXT")
+            self.conn.execute("ALTER TABLE query_results ADD COLUMN expected TEXT")
+            functions = {}
+            for run_id, line_number, plugin_name, function_name in self.conn.execute(
+                "SELECT run_id, line_number, plugin_name, function_name FROM function_results "
+                "ORDER BY run_id, line_number, position"
+            ):
+                functions.setdefault((run_id, line_number), []).append(
+                    {"plugin_name": plugin_name, "function_name": function_name}
+                )
+            runs = {}
+            for run_id, line_number, fingerprint in self.conn.execute(
+                "SELECT run_id, line_number, query_fingerprint FROM query_results ORDER BY run_id, line_number"
+            ):
+                runs.setdefault(run_id, []).append(
+                    (line_number, fingerprint, expected_signature(functions.get((run_id, line_number))))
+                )
+            updates = []
+            for run_id, rows in runs.items():
+                keys = case_keys((fingerprint, signature) for _, fingerprint, signature in rows)
+                updates.extend(
+                    (key, signature, run_id, line_number) for key, (line_number, _, signature) in zip(keys, rows)
+                )
+            self.conn.executemany(
+                "UPDATE query_results SET case_key = ?, expected = ? WHERE run_id = ? AND line_number = ?", updates
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def has_run(self, run_id):
+        cur = self.conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,))
+        return cur.fetchone() is not None
+
+    def ingest_run(self, run_id, rows, metrics, eval_name=None, label=None, source_file=None, created_at=None):
+        """
+        Insert one evaluation run (rows and metrics as written by evaluate()).
+        Re-ingesting an existing run id replaces it.
+        """
+        created_at = created_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        query_rows = []
+        function_rows = []
+        fingerprints = [query_fingerprint(row.get("inputs.query")) for row in rows]
+        signatures = [expected_signature(row.get("inputs.expected_function")) for row in rows]
+        keys = case_keys(zip(fingerprints, signatures))
+        for index, row in enumerate(rows):
+            line_number = row.get("line_number", index)
+            query = row.get("inputs.query")
+            overall = _as_int(row.get(OUTPUT_PREFIX + "Overall_accuracy"))
+            query_rows.append((
+                run_id,
+                line_number,
+                fingerprints[index],
+                query,
+                keys[index],
+                signatures[index],
+                _as_int(row.get(OUTPUT_PREFIX + "Plugin_name_accuracy")),
+                _as_int(row.get(OUTPUT_PREFIX + "Function_name_accuracy")),
+                _as_int(row.get(OUTPUT_PREFIX + "Arguments_accuracy")),
+                overall,
+            ))
+            for position, func in enumerate(row.get("inputs.expected_function") or []):
+                function_rows.append((
+                    run_id,
+                    line_number,
+                    position,
+                    func.get("plugin_name"),
+                    func.get("function_name"),
+                    overall or 0,
+                ))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM function_results WHERE run_id = ?", (run_id,))
+            self.conn.execute("DELETE FROM query_results WHERE run_id = ?", (run_id,))
+            self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "INSERT INTO runs (run_id, created_at, eval_name, label, source_file, row_count, metrics_json) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, created_at, eval_name, label, source_file, len(query_rows), json.dumps(metrics or {})),
+            )
+            self.conn.executemany(
+                "INSERT INTO query_results (run_id, line_number, query_fingerprint, query, case_key, expected, "
+                "plugin_name_accuracy, function_name_accuracy, arguments_accuracy, overall_accuracy) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                query_rows,
+            )
+            self.conn.executemany(
+                "INSERT INTO function_results VALUES (?, ?, ?, ?, ?, ?)", function_rows
+            )
+
+    def latest_runs(self, limit):
+        """Return the most recent runs, oldest first."""
+        cur = self.conn.execute(
+            "SELECT run_id, created_at, eval_name, label, row_count, metrics_json "
+            "FROM runs ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (limit,),
+        )
+        runs = [
+            {
+                "run_id": r[0],
+                "created_at": r[1],
+                "eval_name": r[2],
+                "label": r[3],
+                "row_count": r[4],
+                "metrics": json.loads(r[5] or "{}"),
+            }
+            for r in cur.fetchall()
+        ]
+        runs.reverse()
+        return runs
+
+    def plugin_accuracy(self, run_ids):
+        """Return {plugin_name: {run_id: {'total', 'correct', 'accuracy'}}} for the given runs."""
+        if not run_ids:
+            return {}
+        placeholders = ",".join("?" for _ in run_ids)
+        cur = self.conn.execute(
+            f"SELECT plugin_name, run_id, COUNT(*), SUM(correct) FROM function_results "
+            f"WHERE run_id IN ({placeholders}) GROUP BY plugin_name, run_id",
+            list(run_ids),
+        )
+        result = {}
+        for plugin, run_id, total, correct in cur.fetchall():
+            result.setdefault(plugin, {})[run_id] = {
+                "total": total,
+                "correct": correct,
+                "accuracy": correct / total * 100 if total else 0.0,
+            }
+        return result
+
+    def query_flips(self, run_ids):
+        """
+        Return test cases whose overall outcome differs between any of the given runs, as a
+        list of {'case_key', 'fingerprint', 'query', 'expected', 'outcomes': {run_id: 0/1}}.
+        Repeated queries are separate cases (see case_keys), so a flip on any repeat shows.
+        """
+        if len(run_ids) < 2:
+            return []
+        placeholders = ",".join("?" for _ in run_ids)
+        cur = self.conn.execute(
+            f"SELECT case_key, query_fingerprint, run_id, query, expected, overall_accuracy FROM query_results "
+            f"WHERE run_id IN ({placeholders}) AND case_key IN ("
+            f"  SELECT case_key FROM query_results WHERE run_id IN ({placeholders}) "
+            f"  GROUP BY case_key HAVING MIN(overall_accuracy) <> MAX(overall_accuracy)"
+            f")",
+            list(run_ids) * 2,
+        )
+        flips = {}
+        for case_key, fingerprint, run_id, query, expected, overall in cur.fetchall():
+            entry = flips.setdefault(case_key, {
+                "case_key": case_key, "fingerprint": fingerprint, "query": query, "expected": expected, "outcomes": {},
+            })
+            entry["outcomes"][run_id] = overall
+        return sorted(flips.values(), key=lambda x: (x["query"] or "", x["case_key"]))
+
+
+def get_history_db_path(config):
+    """Resolve the run history database path from config."""
+    history_config = config["run_history"]
+    dataset_path = Path(__file__).resolve().parents[1]
+    return os.path.join(dataset_path, history_config["db_path"], history_config["db_file"])
+
+
+def ingest_results_file(store, results_file, eval_name=None, label=None):
+    """Load an evaluation_results.json file and ingest it. Returns the run id."""
+    with open(results_file, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+
+    # Re-ingesting the same results file is idempotent, while byte-identical results written
+    # by different runs (different modification times) or given different labels stay apart
+    run_stamp = f"{os.stat(results_file).st_mtime_ns}|{label or ''}".encode("utf-8")
+    run_id = hashlib.sha1(raw + b"\0" + run_stamp).hexdigest()[:12]
+    store.ingest_run(
+        run_id,
+        data.get("rows", []),
+        data.get("metrics", {}),
+        eval_name=eval_name,
+        label=label,
+        source_file=results_file,
+    )
+    return run_id
+
+
+def main():
+    try:
+        config = load_config()
+        history_config = config["run_history"]
+        eval_config = config["evaluation"]
+        logger.info("Run history config loaded successfully.")
+    except Exception as e:
+        logger.exception("Failed to load run history config.")
+        return
+
+    try:
+        dataset_path = Path(__file__).resolve().parents[1]
+        results_file = os.path.join(dataset_path, eval_config["output_path"], eval_config["output_file"])
+        db_path = get_history_db_path(config)
+        label_env = history_config.get("label_env")
+        label = os.environ.get(label_env) if label_env else None
+    except KeyError as e:
+        logger.exception(f"Missing run history config key: {e}")
+        return
+
+    try:
+        with RunHistoryStore(db_path) as store:
+            run_id = ingest_results_file(store, results_file, eval_name=eval_config.get("eval_name"), label=label)
+        logger.info(f"Ingested evaluation run {run_id} into {db_path}")
+    except FileNotFoundError:
+        logger.error(f"Evaluation results not found: {results_file}")
+    except Exception as e:
+        logger.exception("Failed to ingest evaluation run.")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
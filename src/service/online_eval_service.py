@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+# The service can be started as a script, so put src/ and the step folders on the path first
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SRC_PATH)
+sys.path.insert(0, os.path.join(SRC_PATH, 'evaluator'))
+sys.path.insert(0, os.path.join(SRC_PATH, 'datatransformer'))
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+from data_transform import replace_predicted_with_mapped
+from evaluator_repo.end_to_end_function_call_eval import EndToEndFunctionCallEvaluator
+from evaluator_repo.response_similarity_eval import ResponseSimilarityEvaluator
+from local_eval import EVALUATOR_NAME, SIMILARITY_COLUMN, SIMILARITY_EVALUATOR_NAME, score_row, score_similarity, to_result_row
+from utils.load_config import load_config
+from utils.load_mapping_schema import load_mapping_schema
+from utils.logger import logger, setup_logging
+
+DEFAULT_SERVICE_CONFIG = {
+    "host": "0.0.0.0",
+    "port": 8080,
+    "executor": "process",
+    "workers": 4,
+    "queue_size": 64,
+    "max_batch_records": 1000,
+    "request_timeout_seconds": 30,
+    "rolling_window": 10000,
+}
+
+# Record fields the transform and the evaluator iterate as lists of function calls
+FUNCTION_LIST_KEYS = ("expected_function", "predicted_function")
+
+# Per-worker evaluators and mapping schema, created once by the pool initializer
+_worker_state = {}
+
+
+def _init_worker():
+    setup_logging()
+    _worker_state["evaluator"] = EndToEndFunctionCallEvaluator()
+    _worker_state["similarity_evaluator"] = ResponseSimilarityEvaluator()
+    _worker_state["mapping_schema"] = load_mapping_schema()
+
+
+def score_records(records):
+    """Transform agent records with the mapping schema and score them. Runs inside the worker pool."""
+    if not _worker_state:
+        _init_worker()
+    transformed = replace_predicted_with_mapped(records, _worker_state["mapping_schema"])
+    similarities = score_similarity(_worker_state["similarity_evaluator"], transformed)
+    return [
+        (item, score_row(_worker_state["evaluator"], item), similarity)
+        for item, similarity in zip(transformed, similarities)
+    ]
+
+
+class RollingAggregates:
+    """Accuracy over the last `window` scored rows, overall and per expected plugin, updated in O(1) per row."""
+
+    def __init__(self, window=10000):
+        self.rows = deque()
+        self.window = window
+        self.total_scored = 0
+        self.sums = {}
+        self.similarity_sum = 0.0
+        self.plugin_sums = {}
+
+    def _apply(self, plugin, outputs, similarity, sign):
+        self.similarity_sum += sign * similarity
+        for key, value in outputs.items():
+            if isinstance(value, bool):
+                self.sums[key] = self.sums.get(key, 0) + sign * value
+        counts = self.plugin_sums.setdefault(plugin, [0, 0])
+        counts[0] += sign * bool(outputs.get("Overall_accuracy"))
+        counts[1] += sign
+        if counts[1] == 0:
+            del self.plugin_sums[plugin]
+
+    def add(self, item, outputs, similarity):
+        plugin = (item.get("expected_function") or [{}])[0].get("plugin_name") or "none"
+        self.rows.append((plugin, outputs, similarity))
+        self._apply(plugin, outputs, similarity, 1)
+        if len(self.rows) > self.window:
+            self._apply(*self.rows.popleft(), -1)
+        self.total_scored += 1
+
+    def snapshot(self):
+        size = len(self.rows)
+        metrics = {f"{EVALUATOR_NAME}.{key}": total / size for key, total in self.sums.items()} if size else {}
+        if size:
+            metrics[f"{SIMILARITY_EVALUATOR_NAME}.Response_similarity"] = self.similarity_sum / size
+        return {
+            "total_scored": self.total_scored,
+            "window_size": size,
+            "metrics": metrics,
+            "plugin_overall_accuracy": {
+                plugin: correct / count for plugin, (correct, count) in sorted(self.plugin_sums.items())
+            },
+        }
+
+
+class ScoringQueue:
+    """
+    Bounded queue of scoring requests drained by `workers` consumers into an executor.
+    A full queue rejects new requests instead of buffering them, so callers back off.
+    """
+
+    def __init__(self, executor, workers, queue_size, aggregates):
+        self.executor = executor
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.aggregates = aggregates
+        self._consumers = []
+
+    def start(self):
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            records, future = await self.queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                scored = await loop.run_in_executor(self.executor, score_records, records)
+                for item, outputs, similarity in scored:
+                    self.aggregates.add(item, outputs, similarity)
+                if not future.cancelled():
+                    future.set_result(scored)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    def submit(self, records):
+        """Enqueue records for scoring. Raises asyncio.QueueFull when the queue is at capacity."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((records, future))
+        return future
+
+
+def get_service_config():
+    config = load_config() or {}
+    return {**DEFAULT_SERVICE_CONFIG, **(config.get("online_evaluation") or {})}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    service_config = get_service_config()
+    if service_config["executor"] == "process":
+        executor = ProcessPoolExecutor(max_workers=service_config["workers"], initializer=_init_worker)
+    else:
+        executor = ThreadPoolExecutor(max_workers=service_config["workers"], initializer=_init_worker)
+
+    app.state.config = service_config
+    app.state.aggregates = RollingAggregates(service_config["rolling_window"])
+    app.state.scoring = ScoringQueue(executor, service_config["workers"], service_config["queue_size"], app.state.aggregates)
+    app.state.scoring.start()
+    logger.info(f"Online evaluation service started with {service_config['workers']} {service_config['executor']} workers.")
+    try:
+        yield
+    finally:
+        await app.state.scoring.stop()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Online evaluation service stopped.")
+
+
+app = FastAPI(title="Online function call evaluation", lifespan=lifespan)
+
+
+def record_error(record):
+    """Why a record cannot be scored, or None when its shape is valid."""
+    if not isinstance(record, dict):
+        return "must be a JSON object"
+    for key in FUNCTION_LIST_KEYS:
+        if key in record and not (
+            isinstance(record[key], list) and all(isinstance(func, dict) for func in record[key])
+        ):
+            return f"'{key}' must be a list of JSON objects"
+    trajectory = record.get("trajectory")
+    if trajectory is not None and not (
+        isinstance(trajectory, list)
+        and all(isinstance(entry, dict) and isinstance(entry.get("calls", []), list) for entry in trajectory)
+    ):
+        return "'trajectory' must be a list of rounds with a 'calls' list"
+    return None
+
+
+async def score(request, records):
+    """Validate, enqueue and await a batch of agent records. Returns evaluation result rows."""
+    service_config = request.app.state.config
+    if not records:
+        raise HTTPException(status_code=422, detail="No records to score.")
+    if len(records) > service_config["max_batch_records"]:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {service_config['max_batch_records']} records.")
+    for index, record in enumerate(records):
+        error = record_error(record)
+        if error:
+            raise HTTPException(status_code=422, detail=f"Record {index}: {error}.")
+
+    try:
+        future = request.app.state.scoring.submit(records)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Scoring queue is full, retry later.", headers={"Retry-After": "1"})
+
+    try:
+        scored = await asyncio.wait_for(future, timeout=service_config["request_timeout_seconds"])
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Scoring timed out.")
+    except Exception as e:
+        logger.exception("Online scoring failed.")
+        raise HTTPException(status_code=500, detail=f"Scoring failed: {e}")
+
+    rows = []
+    for index, (item, outputs, similarity) in enumerate(scored):
+        row = to_result_row(item, outputs, index)
+        row[SIMILARITY_COLUMN] = similarity
+        rows.append(row)
+    return rows
+
+
+@app.post("/score")
+async def score_json(request: Request):
+    """Score one agent record (JSON object) or a list of records (JSON array)."""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON.")
+    rows = await score(request, body if isinstance(body, list) else [body])
+    return JSONResponse({"rows": rows, "aggregates": request.app.state.aggregates.snapshot()})
+
+
+@app.post("/score/ndjson")
+async def score_ndjson(request: Request):
+    """Score an NDJSON batch of agent records; responds with one result row per line."""
+    try:
+        records = [json.loads(line) for line in (await request.body()).decode("utf-8").splitlines() if line.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid NDJSON.")
+    rows = await score(request, records)
+    return Response("\n".join(json.dumps(row) for row in rows) + "\n", media_type="application/x-ndjson")
+
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Rolling accuracy aggregates."""
+    return request.app.state.aggregates.snapshot()
+
+
+@app.get("/health")
+async def health(request: Request):
+    scoring = request.app.state.scoring
+    return {"status": "ok", "queue_depth": scoring.queue.qsize(), "queue_size": scoring.queue.maxsize}
+
+
+def main():
+    setup_logging()
+    service_config = get_service_config()
+    uvicorn.run(app, host=service_config["host"], port=service_config["port"])
+
+
+if __name__ == "__main__":
+    main()
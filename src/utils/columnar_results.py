@@ -0,0 +1,229 @@
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from utils.function_call_record import encode_function_call
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = ds = None
+
+METRICS_SIDECAR = "metrics.json"
+PARTITION_COLUMN = "expected_plugin"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet evaluation results. Install it with `pip install pyarrow`.")
+
+
+def short_column_name(key):
+    """
+    Short Parquet column name for an evaluate() row key, e.g.
+    'outputs.end_to_end_function_call.Overall_accuracy' -> 'overall_accuracy'.
+    """
+    if key.startswith("outputs.") and key.count(".") == 2:
+        return key.rsplit(".", 1)[1].lower()
+    if key.startswith("inputs."):
+        return key[len("inputs."):]
+    return key.replace(".", "__")
+
+
+def function_call_type():
+    """Struct type for one function call; argument values are JSON-encoded to stay lossless."""
+    return pa.struct([
+        ("plugin_name", pa.string()),
+        ("function_name", pa.string()),
+        ("arguments", pa.map_(pa.string(), pa.string())),
+        ("result", pa.string()),
+    ])
+
+
+def _arrow_type(key, values):
+    """
+    Arrow type for a row key. Columns without a fixed type are typed from all their
+    non-None values: ints mixed with floats widen to float64, and any other mix of types
+    is stored as (JSON) text.
+    """
+    if key.endswith("_function"):
+        return pa.list_(function_call_type())
+    if key == "inputs.performance":
+        return pa.struct([
+            ("time_to_first_token_ms", pa.float64()),
+            ("total_latency_ms", pa.float64()),
+            ("tool_call_rounds", pa.int64()),
+            ("prompt_tokens", pa.int64()),
+            ("completion_tokens", pa.int64()),
+        ])
+    if key == "inputs.routing":
+        return pa.struct([
+            ("candidate_plugins", pa.list_(pa.string())),
+            ("exposed_functions", pa.int64()),
+            ("recall", pa.float64()),
+        ])
+    kinds = {type(v) for v in values if v is not None}
+    if kinds == {bool}:
+        return pa.bool_()
+    if kinds == {int}:
+        return pa.int64()
+    if kinds and kinds <= {int, float}:
+        return pa.float64()
+    # Itemwise 0/1 match lists
+    if kinds == {list} and all(
+        type(item) is int and -128 <= item <= 127 for v in values if v is not None for item in v
+    ):
+        return pa.list_(pa.int8())
+    return pa.string()
+
+
+def _encode_calls(calls):
+    if calls is None:
+        return None
+    return [
+        {
+            "plugin_name": call.get("plugin_name"),
+            "function_name": call.get("function_name"),
+            "arguments": [(k, json.dumps(v)) for k, v in (call.get("arguments") or {}).items()]
+            if call.get("arguments") is not None else None,
+            "result": call.get("result"),
+        }
+        for call in calls
+    ]
+
+
+def _decode_calls(calls):
+    if calls is None:
+        return None
+    return [
+        {
+            "arguments": {k: json.loads(v) for k, v in call["arguments"]} if call["arguments"] is not None else None,
+            "result": call["result"],
+            "function_name": call["function_name"],
+            "plugin_name": call["plugin_name"],
+        }
+        for call in calls
+    ]
+
+
+def rows_to_table(rows):
+    """
+    Convert evaluate() rows into an Arrow table with short column names, function-call
+    lists as struct columns and an `expected_plugin` partition column. Columns holding
+    other JSON values (e.g. trajectories) are stored as JSON text, and all-None columns
+    are kept as null strings. Returns (table, {column: original key}, [JSON columns]).
+    """
+    _require_pyarrow()
+    keys = list(dict.fromkeys(key for row in rows for key in row))
+    column_map = {short_column_name(key): key for key in keys}
+
+    fields, arrays, json_columns = [], [], []
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        arrow_type = _arrow_type(key, values)
+        if key.endswith("_function"):
+            values = [_encode_calls(v) for v in values]
+        elif pa.types.is_string(arrow_type) and any(v is not None and not isinstance(v, str) for v in values):
+            # Every value is encoded, strings included, so the column decodes back unchanged
+            values = [None if v is None else json.dumps(v, default=encode_function_call) for v in values]
+            json_columns.append(short_column_name(key))
+        fields.append(pa.field(short_column_name(key), arrow_type))
+        arrays.append(pa.array(values, type=arrow_type))
+
+    fields.append(pa.field(PARTITION_COLUMN, pa.string()))
+    arrays.append(pa.array([
+        (row.get("inputs.expected_function") or [{}])[0].get("plugin_name") or "none" for row in rows
+    ], type=pa.string()))
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields)), column_map, json_columns
+
+
+def write_parquet_results(rows, metrics, output_dir, row_group_size=100_000, extra=None):
+    """
+    Write evaluation rows as a Parquet dataset partitioned by expected plugin, plus a small
+    metrics.json sidecar holding the metrics and the column name mapping. Any previous
+    dataset in `output_dir` is removed first, so partitions of earlier runs never remain.
+    """
+    _require_pyarrow()
+    table, column_map, json_columns = rows_to_table(rows)
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    ds.write_dataset(
+        table,
+        output_dir,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive"),
+        existing_data_behavior="delete_matching",
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, 1024),
+    )
+
+    sidecar = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "row_count": len(rows),
+        "metrics": metrics,
+        "columns": column_map,
+        "json_columns": json_columns,
+        **(extra or {}),
+    }
+    with open(os.path.join(output_dir, METRICS_SIDECAR), "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, indent=2)
+    return output_dir
+
+
+def load_metrics_sidecar(dataset_dir):
+    """Read the metrics sidecar of a Parquet results dataset."""
+    with open(os.path.join(dataset_dir, METRICS_SIDECAR), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_parquet_results(dataset_dir, columns=None, plugins=None, filter=None):
+    """
+    Load rows from a Parquet results dataset in the evaluate() row shape. Only `columns`
+    (short names; None for all) are read, `plugins` prunes partitions by expected plugin
+    and `filter` is an optional pyarrow.dataset expression pushed down to the row groups.
+    Returns (rows, metrics).
+    """
+    _require_pyarrow()
+    if not os.path.isdir(dataset_dir):
+        raise FileNotFoundError(f"File not found: {dataset_dir}. Ensure the path is correct.")
+
+    sidecar = load_metrics_sidecar(dataset_dir)
+    column_map = sidecar["columns"]
+
+    dataset = ds.dataset(
+        dataset_dir,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive"),
+        exclude_invalid_files=True,
+    )
+
+    expression = filter
+    if plugins:
+        plugin_filter = ds.field(PARTITION_COLUMN).isin(list(plugins))
+        expression = plugin_filter if expression is None else expression & plugin_filter
+
+    read_columns = [c for c in (columns or column_map) if c in column_map]
+    if "line_number" in column_map and "line_number" not in read_columns:
+        read_columns.append("line_number")
+    table = dataset.to_table(columns=read_columns, filter=expression)
+
+    json_columns = set(sidecar.get("json_columns", []))
+    rows = []
+    for record in table.to_pylist():
+        row = {}
+        for column, value in record.items():
+            key = column_map[column]
+            if key.endswith("_function"):
+                value = _decode_calls(value)
+            elif column in json_columns and value is not None:
+                value = json.loads(value)
+            row[key] = value
+        rows.append(row)
+
+    # Partitioning groups rows by plugin; restore evaluation order
+    if "line_number" in column_map:
+        rows.sort(key=lambda r: r["line_number"])
+    return rows, sidecar["metrics"]
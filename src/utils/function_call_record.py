@@ -0,0 +1,265 @@
+import json
+import threading
+
+FIELDS = ("arguments", "result", "function_name", "plugin_name")
+
+# Record fields holding function call lists, and trajectories (lists of rounds of calls)
+RECORD_KEYS = ("expected_function", "predicted_function", "predicted_trajectory")
+
+
+def _freeze(value, ordered=True):
+    """
+    Hashable, type-preserving key for a JSON value. With ordered=False, dict keys are
+    sorted and numbers share one tag, so that keys compare the way dicts do (1 == 1.0).
+    """
+    if type(value) is dict:
+        # Fast path for the usual flat dict of string arguments
+        if all(type(v) is str for v in value.values()):
+            items = tuple(value.items())
+            return ("dict", items if ordered else tuple(sorted(items)))
+        items = ((k, _freeze(v, ordered)) for k, v in value.items())
+        return ("dict", tuple(items if ordered else sorted(items, key=lambda kv: repr(kv[0]))))
+    if isinstance(value, dict):
+        return _freeze(dict(value), ordered)
+    if isinstance(value, (list, tuple)):
+        return ("list", tuple(_freeze(v, ordered) for v in value))
+    if not ordered and isinstance(value, (bool, int, float)):
+        return ("number", value)
+    return (type(value).__name__, value)
+
+
+class InternTable:
+    """Maps repeated values to small integer ids; each distinct value is stored once."""
+
+    def __init__(self, key=_freeze):
+        self._key = key
+        self._ids = {}
+        self._values = []
+        self._lock = threading.Lock()
+
+    def id(self, value):
+        # Strings and None are their own keys; the key function never returns either
+        key = value if value is None or type(value) is str else self._key(value)
+        value_id = self._ids.get(key)
+        if value_id is None:
+            with self._lock:
+                value_id = self._ids.get(key)
+                if value_id is None:
+                    value_id = len(self._values)
+                    self._values.append(value)
+                    self._ids[key] = value_id
+        return value_id
+
+    def value(self, value_id):
+        return self._values[value_id]
+
+    def __len__(self):
+        return len(self._values)
+
+
+def _unordered(value):
+    return _freeze(value, ordered=False)
+
+
+class InternScope:
+    """
+    Intern tables for the records of one load or evaluation call. Records keep a reference
+    to their scope, so the tables are freed together with the last record that uses them.
+    Ids are only comparable between records of the same scope.
+    """
+
+    def __init__(self):
+        self.names = InternTable()
+        self.layouts = InternTable(key=tuple)
+        # Arguments and results are stored as given, and keyed for equality like dicts are
+        # compared (key order ignored); each distinct stored value is keyed once
+        self.arguments = InternTable()
+        self.argument_keys = InternTable(key=_unordered)
+        self.results = InternTable()
+        self.result_keys = InternTable(key=_unordered)
+        self._key_ids = {"arguments": {}, "results": {}}
+        self._dict_keys = {}
+
+    def intern_keyed(self, kind, value):
+        """(value id, equality key id) of an arguments or results value."""
+        values, keys = (self.arguments, self.argument_keys) if kind == "arguments" else (self.results, self.result_keys)
+        value_id = values.id(value)
+        key_ids = self._key_ids[kind]
+        key_id = key_ids.get(value_id)
+        if key_id is None:
+            key_id = key_ids[value_id] = keys.id(value)
+        return value_id, key_id
+
+    def json_decoder(self, compact_keys=RECORD_KEYS):
+        """
+        JSONDecoder that loads records into this scope. Dict keys are shared across every
+        document it decodes (json only shares them within one document), and a dict holding
+        one of `compact_keys` is compacted as soon as it is parsed, so the plain function
+        call dicts of a large file are never all in memory at once.
+        """
+        dict_keys = self._dict_keys
+        compact = frozenset(compact_keys)
+
+        def object_pairs_hook(pairs):
+            obj = {dict_keys.setdefault(key, key): value for key, value in pairs}
+            if not compact.isdisjoint(obj):
+                compact_record(obj, self, compact_keys)
+            return obj
+
+        return json.JSONDecoder(object_pairs_hook=object_pairs_hook)
+
+
+# Slot holding each field's equality key
+FIELD_SLOTS = {"plugin_name": "plugin", "function_name": "function", "arguments": "arguments_key", "result": "result_key"}
+
+
+class FunctionCall:
+    """
+    Compact function call record: plugin, function, arguments and result are ids interned in
+    an InternScope, so equal fields of records from one scope compare as integers and repeated
+    strings are held once per scope. Reads like the dict it came from (`call["plugin_name"]`,
+    `call.get("arguments")`) and converts back losslessly with to_dict(), including key order
+    and absent keys.
+    """
+
+    __slots__ = ("scope", "plugin", "function", "arguments", "arguments_key", "result", "result_key", "layout", "extra")
+
+    def __init__(self, scope, plugin_name=None, function_name=None, arguments=None, result=None, layout=FIELDS,
+                 extra=None):
+        self.scope = scope
+        self.plugin = scope.names.id(plugin_name)
+        self.function = scope.names.id(function_name)
+        self.arguments, self.arguments_key = scope.intern_keyed("arguments", arguments)
+        self.result, self.result_key = scope.intern_keyed("results", result)
+        self.layout = scope.layouts.id(layout)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, func, scope):
+        if isinstance(func, cls):
+            if func.scope is scope:
+                return func
+            func = func.to_dict()
+        layout = tuple(func)
+        extra = None
+        if layout != FIELDS:
+            extra = {k: v for k, v in func.items() if k not in FIELDS} or None
+        return cls(
+            scope,
+            plugin_name=func.get("plugin_name"),
+            function_name=func.get("function_name"),
+            arguments=func.get("arguments"),
+            result=func.get("result"),
+            layout=layout,
+            extra=extra,
+        )
+
+    def get(self, field, default=None):
+        if field not in self.keys():
+            return default
+        if field == "plugin_name":
+            return self.scope.names.value(self.plugin)
+        if field == "function_name":
+            return self.scope.names.value(self.function)
+        if field == "arguments":
+            arguments = self.scope.arguments.value(self.arguments)
+            # Interned dicts are shared, so hand out a copy
+            return dict(arguments) if isinstance(arguments, dict) else arguments
+        if field == "result":
+            return self.scope.results.value(self.result)
+        return self.extra[field]
+
+    def __getitem__(self, field):
+        if field not in self.keys():
+            raise KeyError(field)
+        return self.get(field)
+
+    def __contains__(self, field):
+        return field in self.keys()
+
+    def keys(self):
+        return self.scope.layouts.value(self.layout)
+
+    def field_id(self, field):
+        """
+        Integer key of a field for equality checks between records of the same scope;
+        arguments and results compare like dicts (key order ignored). Absent fields were
+        interned as None, so they match like dict.get.
+        """
+        slot = FIELD_SLOTS.get(field)
+        return getattr(self, slot) if slot else self.get(field)
+
+    def to_dict(self):
+        return {field: self.get(field) for field in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        if not isinstance(other, FunctionCall):
+            return NotImplemented
+        if other.scope is not self.scope:
+            return self.to_dict() == other.to_dict()
+        return (
+            self.plugin == other.plugin
+            and self.function == other.function
+            and self.arguments_key == other.arguments_key
+            and self.result_key == other.result_key
+            and self.extra == other.extra
+            and (self.layout == other.layout or set(self.keys()) == set(other.keys()))
+        )
+
+    def __hash__(self):
+        # Names hash the same in every scope, so records equal across scopes hash alike
+        names = self.scope.names
+        return hash((names.value(self.plugin), names.value(self.function)))
+
+    def __reduce__(self):
+        # Ids mean nothing outside their scope, so records travel as plain dicts
+        return (dict, (self.to_dict(),))
+
+    def __repr__(self):
+        return f"FunctionCall({self.to_dict()!r})"
+
+
+def shared_scope(*function_lists):
+    """The scope of the first FunctionCall record in the given lists, or None if they hold only dicts."""
+    for functions in function_lists:
+        for func in functions or ():
+            if type(func) is FunctionCall:
+                return func.scope
+    return None
+
+
+def call_key(func):
+    """Hashable key of a function call that compares like the call does: records as is, dicts frozen."""
+    return func if type(func) is FunctionCall else _unordered(func)
+
+
+def as_function_calls(functions, scope):
+    """Convert a list of function call dicts (or records) to FunctionCall records of `scope`."""
+    if functions is None:
+        return None
+    return [FunctionCall.from_dict(func, scope) for func in functions]
+
+
+def compact_record(item, scope, keys=RECORD_KEYS):
+    """
+    Replace the function call lists of a record with FunctionCall records of `scope`, in place.
+    Keys ending in `_trajectory` hold rounds of calls, and each round is compacted.
+    """
+    for key in keys:
+        value = item.get(key)
+        if not isinstance(value, list):
+            continue
+        if key.endswith("_trajectory"):
+            item[key] = [as_function_calls(calls, scope) if isinstance(calls, list) else calls for calls in value]
+        else:
+            item[key] = as_function_calls(value, scope)
+    return item
+
+
+def encode_function_call(obj):
+    """json.dump(default=...) hook that writes FunctionCall records in their original dict shape."""
+    if isinstance(obj, FunctionCall):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
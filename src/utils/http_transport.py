@@ -0,0 +1,249 @@
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+from openai import AsyncAzureOpenAI
+
+from utils.load_config import load_config
+from utils.logger import logger
+
+DEFAULT_TRANSPORT_CONFIG = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry_seconds": 30,
+    "http2": True,
+    "connect_timeout_seconds": 5,
+    "read_timeout_seconds": 120,
+    "write_timeout_seconds": 30,
+    "pool_timeout_seconds": 10,
+    "token_refresh_margin_seconds": 300,
+}
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+# Process-wide clients, created on first use
+_shared = {}
+_lock = threading.Lock()
+
+
+def get_transport_config():
+    try:
+        config = load_config() or {}
+    except Exception:
+        logger.exception("Failed to load http_transport config; using defaults.")
+        config = {}
+    return {**DEFAULT_TRANSPORT_CONFIG, **(config.get("http_transport") or {})}
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class CachedTokenCredential:
+    """
+    Token credential wrapper holding one cached token per scope for the whole process, for
+    synchronous clients (AIProjectClient, exporters) that call it from worker threads.
+    A token is renewed `refresh_margin` seconds before it expires: while it is still valid,
+    one thread refreshes it and the others keep using the cached token instead of waiting.
+    """
+
+    def __init__(self, credential, refresh_margin=300):
+        self._credential = credential
+        self._refresh_margin = refresh_margin
+        self._tokens = {}
+        self._refresh_lock = threading.Lock()
+
+    def _fetch(self, scopes):
+        token = self._credential.get_token(*scopes)
+        self._tokens[scopes] = token
+        return token
+
+    def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs):
+        if claims or tenant_id or kwargs:
+            # Claims challenges and tenant overrides must reach the identity provider
+            return self._credential.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        token = self._tokens.get(scopes)
+        now = time.time()
+        if token is not None and token.expires_on - now > self._refresh_margin:
+            return token
+
+        if token is not None and token.expires_on > now:
+            if not self._refresh_lock.acquire(blocking=False):
+                return token
+            try:
+                return self._fetch(scopes)
+            except Exception:
+                logger.warning("Proactive token refresh failed; using the cached token until it expires.")
+                return token
+            finally:
+                self._refresh_lock.release()
+
+        with self._refresh_lock:
+            token = self._tokens.get(scopes)
+            if token is not None and token.expires_on - time.time() > self._refresh_margin:
+                return token
+            return self._fetch(scopes)
+
+    def close(self):
+        close = getattr(self._credential, "close", None)
+        if close is not None:
+            close()
+
+
+class AsyncTokenProvider:
+    """
+    Bearer token callable for the async OpenAI clients, on the async DefaultAzureCredential,
+    so fetching a token never blocks the event loop. A token is renewed `refresh_margin`
+    seconds before it expires in a background task, and callers keep getting the cached
+    token meanwhile; only when there is no valid token do callers wait, behind one lock.
+    """
+
+    def __init__(self, credential, scope, refresh_margin=300):
+        self._credential = credential
+        self._scope = scope
+        self._refresh_margin = refresh_margin
+        self._token = None
+        self._lock = None
+        self._refresh_task = None
+
+    async def _fetch(self):
+        self._token = await self._credential.get_token(self._scope)
+        return self._token
+
+    async def _refresh_in_background(self):
+        try:
+            await self._fetch()
+        except Exception:
+            logger.warning("Proactive token refresh failed; using the cached token until it expires.")
+
+    async def __call__(self):
+        token = self._token
+        now = time.time()
+        if token is not None and token.expires_on - now > self._refresh_margin:
+            return token.token
+
+        if token is not None and token.expires_on > now:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh_in_background())
+            return token.token
+
+        # Created on first use, inside the loop that runs the clients
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another caller may have fetched a token while this one waited
+            token = self._token
+            if token is not None and token.expires_on > time.time():
+                return token.token
+            return (await self._fetch()).token
+
+
+def get_credential():
+    """Process-wide DefaultAzureCredential behind a shared token cache."""
+    with _lock:
+        if "credential" not in _shared:
+            transport_config = get_transport_config()
+            _shared["credential"] = CachedTokenCredential(
+                DefaultAzureCredential(), transport_config["token_refresh_margin_seconds"]
+            )
+        return _shared["credential"]
+
+
+def get_async_token_provider(scope=COGNITIVE_SERVICES_SCOPE):
+    """
+    Process-wide async bearer token provider for the async OpenAI clients, one per scope.
+    Like the pooled HTTP client, use it from one event loop per process.
+    """
+    with _lock:
+        providers = _shared.setdefault("async_token_providers", {})
+        if scope not in providers:
+            transport_config = get_transport_config()
+            if "async_credential" not in _shared:
+                _shared["async_credential"] = AsyncDefaultAzureCredential()
+            providers[scope] = AsyncTokenProvider(
+                _shared["async_credential"], scope, transport_config["token_refresh_margin_seconds"]
+            )
+        return providers[scope]
+
+
+def get_async_http_client():
+    """
+    Process-wide pooled, keep-alive httpx.AsyncClient for the OpenAI clients. Falls back to
+    HTTP/1.1 when HTTP/2 is configured but the h2 package is missing. Connections belong to
+    the event loop that opened them, so use it from one loop per process (one pipeline run).
+    """
+    with _lock:
+        client = _shared.get("async_http_client")
+        if client is None or client.is_closed:
+            transport_config = get_transport_config()
+            http2 = transport_config["http2"] and _http2_available()
+            if transport_config["http2"] and not http2:
+                logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1.")
+            client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=transport_config["max_connections"],
+                    max_keepalive_connections=transport_config["max_keepalive_connections"],
+                    keepalive_expiry=transport_config["keepalive_expiry_seconds"],
+                ),
+                timeout=httpx.Timeout(
+                    connect=transport_config["connect_timeout_seconds"],
+                    read=transport_config["read_timeout_seconds"],
+                    write=transport_config["write_timeout_seconds"],
+                    pool=transport_config["pool_timeout_seconds"],
+                ),
+            )
+            _shared["async_http_client"] = client
+        return client
+
+
+def get_azure_core_transport():
+    """
+    Shared azure-core transport over one pooled requests session, for AIProjectClient and the
+    Azure Monitor exporters. The session is not owned by the transport, so closing one client
+    leaves the pool open for the others.
+    """
+    with _lock:
+        if "azure_core_transport" not in _shared:
+            transport_config = get_transport_config()
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=transport_config["max_keepalive_connections"],
+                pool_maxsize=transport_config["max_connections"],
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _shared["azure_core_transport"] = RequestsTransport(
+                session=session,
+                session_owner=False,
+                connection_timeout=transport_config["connect_timeout_seconds"],
+                read_timeout=transport_config["read_timeout_seconds"],
+            )
+        return _shared["azure_core_transport"]
+
+
+def create_azure_openai_client(api_version=None):
+    """
+    AsyncAzureOpenAI client on the shared HTTP client. Authenticates with AZURE_OPENAI_API_KEY
+    when it is set, otherwise with Entra ID tokens from the shared async token provider.
+    """
+    api_key = os.environ.get("AZURE_OPENAI_API_KEY")
+    return AsyncAzureOpenAI(
+        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+        api_key=api_key,
+        azure_ad_token_provider=None if api_key else get_async_token_provider(),
+        api_version=api_version or os.environ["AZURE_OPENAI_API_VERSION"],
+        http_client=get_async_http_client(),
+    )
+
@@ -1,13 +1,145 @@
+import atexit
+import copy
+import json
 import logging
+import multiprocessing
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from utils.load_config import load_config
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+
+DEFAULT_LOGGING_CONFIG = {
+    "file": "pipeline.log",
+    "max_bytes": 10 * 1024 * 1024,
+    "backup_count": 5,
+    "json_lines": False,
+    "max_message_length": 4000,
+    "level": "INFO",
+}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as a single JSON object per line."""
+
+    def format(self, record):
+        # Tracebacks are already folded into the message by QueueHandler.prepare
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Enqueues records for a background listener instead of writing them on the caller's
+    thread, truncating long payloads (e.g. full agent responses) to `max_message_length`.
+    """
+
+    def __init__(self, log_queue, max_message_length=None):
+        super().__init__(log_queue)
+        self.max_message_length = max_message_length
+
+    def prepare(self, record):
+        limit = self.max_message_length
+        if limit:
+            message = record.getMessage()
+            if len(message) > limit:
+                record = copy.copy(record)
+                record.msg = f"{message[:limit]}... [truncated {len(message) - limit} chars]"
+                record.args = None
+        return super().prepare(record)
+
+
+def _load_logging_config():
+    """Return logging settings from config.yaml, falling back to defaults."""
+    settings = dict(DEFAULT_LOGGING_CONFIG)
+    try:
+        settings.update((load_config() or {}).get("logging") or {})
+    except Exception:
+        pass
+    return settings
+
+
+def _log_file_for_process(path, per_process):
+    """Give a worker process its own log file (pid suffix) so no two processes rotate the same file."""
+    if not per_process:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{ext}"
+
+
+# (pid, log file) the running listener was set up for
+_configured = {"key": None, "listener": None}
+
+
+def _release_listener(listener, running):
+    """Stop a previous listener (if it runs in this process) and close its handlers."""
+    if running:
+        listener.stop()
+        atexit.unregister(listener.stop)
+    for handler in listener.handlers:
+        handler.close()
+
+
+def setup_logging(per_process=None):
+    """
+    Route all log records through a queue to file and console handlers running on a
+    listener thread, so logging from the async generation loop never blocks on I/O.
+    Nothing is configured at import; every entry point (script main, pool initializer,
+    spawned stage) calls this once before it logs.
+
+    Worker processes log to their own file: `per_process` defaults to True in multiprocessing
+    children, and script-started workers pass it explicitly. A forked child inherits the
+    queue handler but not the listener thread draining it, so pool initializers call this
+    again; the inherited handlers are closed and replaced.
+    """
+    settings = _load_logging_config()
+    if per_process is None:
+        per_process = multiprocessing.parent_process() is not None
+    log_file = _log_file_for_process(settings["file"], per_process)
+    key = (os.getpid(), log_file)
+    if _configured["key"] == key:
+        return _configured["listener"]
+    if _configured["listener"] is not None:
+        _release_listener(_configured["listener"], running=_configured["key"][0] == os.getpid())
+
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=settings["max_bytes"],
+        backupCount=settings["backup_count"],
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonLinesFormatter() if settings["json_lines"] else logging.Formatter(LOG_FORMAT))
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.Queue(-1)
+    queue_handler = TruncatingQueueHandler(log_queue, settings["max_message_length"])
+    # Only the message (plus traceback) is rendered on the caller's thread
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Flush remaining records on interpreter exit
+    atexit.register(listener.stop)
+
+    # Replace only our own queue handler (possibly inherited from a parent process), so
+    # handlers added by others, such as the OpenTelemetry log handler, stay attached
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, TruncatingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings["level"])
+    _configured.update(key=key, listener=listener)
+    return listener
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("pipeline.log", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
 
 logger = logging.getLogger("pipeline")
 
@@ -0,0 +1,65 @@
+import cProfile
+import io
+import os
+import pstats
+from contextlib import contextmanager
+
+from utils.logger import logger
+
+
+def is_stage_profiled(stage, profiling_config):
+    """True when profiling is enabled for the given pipeline stage."""
+    if not profiling_config or not profiling_config.get("enabled"):
+        return False
+    stages = profiling_config.get("stages", "all")
+    return stages == "all" or stage in stages
+
+
+@contextmanager
+def profile_stage(stage, profiling_config, profile_name=None):
+    """
+    Profile the enclosed block with cProfile or pyinstrument when enabled for `stage`.
+    cProfile writes `<profile_name>.prof` and logs the top functions by cumulative time;
+    pyinstrument writes `<profile_name>.html`. Does nothing when profiling is disabled.
+    """
+    if not is_stage_profiled(stage, profiling_config):
+        yield
+        return
+
+    output_dir = profiling_config.get("output_path", "profiles")
+    profile_name = profile_name or stage
+    os.makedirs(output_dir, exist_ok=True)
+    profiler_name = profiling_config.get("profiler", "cprofile")
+
+    if profiler_name == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed; running stage without profiling.")
+            yield
+            return
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            output_file = os.path.join(output_dir, f"{profile_name}.html")
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            logger.info(f"Profile for stage '{stage}' written to {output_file}")
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        output_file = os.path.join(output_dir, f"{profile_name}.prof")
+        profiler.dump_stats(output_file)
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(profiling_config.get("top_n", 20))
+        logger.info(f"Profile for stage '{stage}' written to {output_file}\n{stream.getvalue()}")
@@ -0,0 +1,31 @@
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+# Key of the first line of every result stream; its value identifies the run
+RUN_HEADER_KEY = "run_header"
+
+
+def open_result_stream(path):
+    """
+    Start the JSONL result stream of a new generation run, truncating the previous one.
+    The first line is a run header with a unique run id, so readers following the file
+    can tell a new run apart from the old one even when it grows past their offset.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    stream = open(path, "w", encoding="utf-8")
+    header = {"run_id": uuid.uuid4().hex, "started_at": datetime.now(timezone.utc).isoformat()}
+    stream.write(json.dumps({RUN_HEADER_KEY: header}) + "\n")
+    stream.flush()
+    return stream
+
+
+def append_result(stream, record):
+    """Append one result line and flush it, so readers see each result as soon as it is done."""
+    stream.write(json.dumps(record) + "\n")
+    stream.flush()
+
+
+def is_run_header(record):
+    return isinstance(record, dict) and RUN_HEADER_KEY in record